@@ -41,6 +41,9 @@ class User(db.Model, UserMixin):
     calorie_goal = db.Column(db.Float, nullable=True)
     goal_weight_kg = db.Column(db.Float, nullable=True)
     weekly_weight_change_lbs = db.Column(db.Float, nullable=True)
+    # Bumped whenever maintenance_calories/calorie_goal or the custom macro
+    # targets are rewritten; readers never derive or store targets themselves.
+    calorie_targets_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # 🔹 Self-referential relationship
     trainer = db.relationship(
@@ -78,6 +81,10 @@ class User(db.Model, UserMixin):
             characters = string.ascii_uppercase + string.digits
             self.trainer_code = ''.join(random.choices(characters, k=6))
 
+    def stamp_calorie_targets(self):
+        """Record that this member's calorie or macro targets changed."""
+        self.calorie_targets_version = (self.calorie_targets_version or 0) + 1
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -93,6 +100,8 @@ class Food(db.Model):
     serving_size = db.Column(db.Float)
     serving_unit = db.Column(db.String(50))
     grams_per_unit = db.Column(db.Float)
+    # Digest of the normalized USDA record this row was imported from; see app.services.usda_import.
+    source_hash = db.Column(db.String(32))
 
 # Make sure this is defined somewhere
 UNIT_TO_GRAMS = {
@@ -122,6 +131,10 @@ UNIT_TO_GRAMS = {
 }
 
 class UserFoodLog(db.Model):
+    __table_args__ = (
+        db.Index('ix_user_food_log_user_date', 'user_id', 'log_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     food_id = db.Column(db.Integer, db.ForeignKey("food.id"), nullable=False)
@@ -129,6 +142,16 @@ class UserFoodLog(db.Model):
     unit = db.Column(db.String(20), default="g")  # <--- add this column
     log_date = db.Column(db.Date, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # What the member typed (e.g. 1 "cup"); ``quantity`` above is always grams.
+    # NULL for logs written in grams, such as whole meals.
+    entered_quantity = db.Column(db.Float, nullable=True)
+    entered_unit = db.Column(db.String(20), nullable=True)
+    # Macros scaled to this log's quantity, stored at write time so daily and
+    # weekly totals are plain SUM()s. NULL only for rows not yet backfilled.
+    calories = db.Column(db.Float)
+    protein = db.Column(db.Float)
+    carbs = db.Column(db.Float)
+    fats = db.Column(db.Float)
 
     food = db.relationship("Food")
 
@@ -150,11 +173,28 @@ class UserFoodLog(db.Model):
         
         return quantity  # Fallback to original quantity if unit is unknown
     
+    def fill_macros(self, food=None):
+        """Store the macros for this log's quantity of ``food`` (default: ``self.food``)."""
+        from app.services.nutrition import scale_food_nutrients
+        scaled = scale_food_nutrients(food or self.food, self.quantity_in_grams())
+        self.calories = scaled["calories"]
+        self.protein = scaled["protein"]
+        self.carbs = scaled["carbs"]
+        self.fats = scaled["fats"]
+        return scaled
+
     @property
     def scaled(self):
-        from app.services.nutrition import scale_food_nutrients
-        quantity_in_grams = self.quantity_in_grams()
-        scaled = scale_food_nutrients(self.food, quantity_in_grams)
+        if self.calories is not None:
+            scaled = {
+                "calories": self.calories,
+                "protein": self.protein or 0.0,
+                "carbs": self.carbs or 0.0,
+                "fats": self.fats or 0.0,
+            }
+        else:
+            from app.services.nutrition import scale_food_nutrients
+            scaled = scale_food_nutrients(self.food, self.quantity_in_grams())
 
         return {
             "calories": round(scaled["calories"], 1),
@@ -164,6 +204,33 @@ class UserFoodLog(db.Model):
         }
 
 
+class FoodPopularity(db.Model):
+    """How many times each food has been logged, across all users."""
+    food_id = db.Column(db.Integer, db.ForeignKey("food.id", ondelete="CASCADE"), primary_key=True)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyNutrition(db.Model):
+    """A member's logged macros for one day, kept in step with ``UserFoodLog`` writes."""
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    calories = db.Column(db.Float, nullable=False, default=0.0)
+    protein = db.Column(db.Float, nullable=False, default=0.0)
+    carbs = db.Column(db.Float, nullable=False, default=0.0)
+    fats = db.Column(db.Float, nullable=False, default=0.0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UsdaImportCheckpoint(db.Model):
+    """How far the USDA importer got through one dataset file, committed with the rows it wrote."""
+    source = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class TrainerMeal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     trainer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -173,6 +240,13 @@ class TrainerMeal(db.Model):
     meal_slot = db.Column(db.String(20), nullable=False, default='meal1')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Totals and serialized ingredients, refreshed whenever the ingredients are
+    # saved. NULL means stale (never computed, or an ingredient's food changed).
+    calories = db.Column(db.Float)
+    protein = db.Column(db.Float)
+    carbs = db.Column(db.Float)
+    fats = db.Column(db.Float)
+    ingredients_cache = db.Column(db.Text)
 
     ingredients = db.relationship(
         'TrainerMealIngredient',
@@ -216,6 +290,13 @@ class MemberMeal(db.Model):
     meal_slot = db.Column(db.String(20), nullable=False, default='meal1')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Totals and serialized ingredients, refreshed whenever the ingredients are
+    # saved. NULL means stale (never computed, or an ingredient's food changed).
+    calories = db.Column(db.Float)
+    protein = db.Column(db.Float)
+    carbs = db.Column(db.Float)
+    fats = db.Column(db.Float)
+    ingredients_cache = db.Column(db.Text)
 
     ingredients = db.relationship(
         'MemberMealIngredient',
@@ -239,6 +320,10 @@ class MemberMealIngredient(db.Model):
 
     food = db.relationship('Food')
 class Progress(db.Model):
+    __table_args__ = (
+        db.Index('ix_progress_user_date', 'user_id', 'date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
@@ -310,6 +395,10 @@ class AssignedTemplate(db.Model):
 
 
 class WorkoutSession(db.Model):
+    __table_args__ = (
+        db.Index('ix_workout_session_user_started', 'user_id', 'started_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     template_id = db.Column(db.Integer, db.ForeignKey('exercise_template.id'))
@@ -317,6 +406,7 @@ class WorkoutSession(db.Model):
     completed_at = db.Column(db.DateTime, nullable=True)
     summary = db.Column(db.String(255), nullable=True)
     notes = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = db.relationship('User', backref=db.backref('workout_sessions', lazy='dynamic'))
     template = db.relationship('ExerciseTemplate')
@@ -336,6 +426,10 @@ class WorkoutSet(db.Model):
 
 
 class Message(db.Model):
+    __table_args__ = (
+        db.Index('ix_message_client_read', 'client_id', 'read_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     trainer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     client_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
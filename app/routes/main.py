@@ -1,6 +1,7 @@
-from flask import Blueprint, render_template, request, session, jsonify
-from flask_login import current_user
+from flask import Blueprint, render_template, request, session, jsonify, current_app
+from flask_login import current_user, login_required
 from app import db
+from app.services.search_telemetry import telemetry
 
 main_bp = Blueprint("main", __name__)
 
@@ -22,3 +23,12 @@ def update_theme():
         db.session.commit()
 
     return jsonify({"status": "ok", "mode": mode})
+
+
+@main_bp.route("/admin/search-telemetry")
+@login_required
+def search_telemetry():
+    admins = current_app.config.get("ADMIN_EMAILS") or []
+    if (current_user.email or "").lower() not in admins:
+        return jsonify({"status": "error", "message": "Unauthorized"}), 403
+    return jsonify({"status": "ok", "endpoints": telemetry.summary()})
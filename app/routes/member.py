@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, session, flash, redirect, request, url_for, jsonify
+from flask import Blueprint, render_template, session, flash, redirect, request, url_for, jsonify, make_response
 from app import db
 from app.models import (
     User,
@@ -15,52 +15,56 @@ from app.models import (
 )
 from app.services.nutrition import (
     scale_food_nutrients,
+    scale_nutrients_batch,
     calculate_meal_macros,
     group_meals_by_slot,
     serialize_meal,
+    refresh_meal_cache,
     convert_to_grams,
+    measure_resolver,
     derive_macro_targets,
+    measures_for_foods,
+    MACRO_KEYS,
     MEAL_SLOT_LABELS,
 )
+from app.services.food_search import (
+    autocomplete as autocomplete_food_index,
+    fuzzy_search_foods,
+    search_foods as search_food_index,
+    first_food_match,
+)
+from app.services import quick_foods as quick_food_cache
+from app.services.daily_nutrition import daily_logged_macros, daily_totals
+from app.services.eastern_time import (
+    EASTERN_TZ,
+    as_eastern as _as_eastern,
+    eastern_date as _eastern_date,
+    format_duration as _format_duration_display,
+    now_eastern as _now_eastern,
+    today_eastern as _today_eastern,
+)
+from app.services.food_logging import log_meal
+from app.services.member_calendar import (
+    calendar_activity,
+    calendar_etag,
+    calendar_weeks as build_calendar_weeks,
+    day_detail,
+    month_activity,
+    month_bounds,
+    month_days,
+)
+from app.services.search_telemetry import track_search
 from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import joinedload
 from flask_login import current_user, login_required, logout_user
 from datetime import datetime, date, timedelta, timezone
 from collections import Counter, defaultdict
 from typing import Dict, Optional
 import math
-import calendar as _calendar
 import pandas as pd
 import plotly.graph_objs as go
-from zoneinfo import ZoneInfo
 
 member_bp = Blueprint('member', __name__, url_prefix='/member')
-EASTERN_TZ = ZoneInfo("America/New_York")
-
-
-def _now_eastern() -> datetime:
-    return datetime.now(EASTERN_TZ)
-
-
-def _today_eastern() -> date:
-    return _now_eastern().date()
-
-
-def _as_eastern(dt: Optional[datetime]) -> Optional[datetime]:
-    if not dt:
-        return None
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(EASTERN_TZ)
-
-
-def _eastern_date(value: Optional[object]) -> Optional[date]:
-    """Normalize a stored date/datetime value into an Eastern-localized date."""
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        localized = _as_eastern(value)
-        return localized.date() if localized else None
-    return value
 
 
 def _week_start_sunday(value: date) -> date:
@@ -203,9 +207,175 @@ def _calculate_calorie_targets(user, weight_lbs=None):
 
 
 def _update_user_calorie_targets(user, weight_lbs=None):
+    """Derive and store ``user``'s calorie targets; call only when their inputs change."""
     maintenance, goal = _calculate_calorie_targets(user, weight_lbs)
     user.maintenance_calories = maintenance if maintenance is not None else None
     user.calorie_goal = goal if goal is not None else None
+    user.stamp_calorie_targets()
+
+def _message_flags(user: User):
+    """Return ``(has_any_messages, has_unread_messages)`` for ``user`` in one query."""
+    if not user.trainer_id:
+        return False, False
+    mine = Message.client_id == user.id
+    return db.session.query(
+        db.exists().where(mine),
+        db.exists().where(mine, Message.read_at.is_(None)),
+    ).one()
+
+
+# -----------------------------
+# Dashboard views
+# -----------------------------
+# Each dashboard tab has a context provider, and a request runs only the one
+# for the tab it renders; the header, nav and scripts share the context built
+# in ``dashboard`` itself.
+def _today_context(user: User, today: date) -> dict:
+    user_food_logs = (
+        UserFoodLog.query
+        .options(joinedload(UserFoodLog.food))
+        .filter_by(user_id=user.id, log_date=today)
+        .all()
+    )
+
+    if user.trainer_id:
+        trainer_meals = (
+            TrainerMeal.query
+            .filter(
+                or_(
+                    TrainerMeal.member_id == user.id,
+                    TrainerMeal.member_id.is_(None),
+                    and_(
+                        TrainerMeal.trainer_id == user.trainer_id
+                    )
+                )
+            )
+            .order_by(TrainerMeal.meal_slot.asc(), TrainerMeal.name.asc())
+            .all()
+        )
+    else:
+        trainer_meals = (
+            TrainerMeal.query
+            .filter(TrainerMeal.member_id == user.id)
+            .order_by(TrainerMeal.meal_slot.asc(), TrainerMeal.name.asc())
+            .all()
+        )
+    member_meals = (
+        MemberMeal.query
+        .filter_by(user_id=user.id)
+        .order_by(MemberMeal.meal_slot.asc(), MemberMeal.name.asc())
+        .all()
+    )
+    return {
+        "user_food_logs": user_food_logs,
+        "totals": _calculate_daily_totals(user.id, today),
+        "meal_plan": group_meals_by_slot(trainer_meals) if trainer_meals else {slot: [] for slot in MEAL_SLOT_LABELS},
+        "member_meal_plan": group_meals_by_slot(member_meals) if member_meals else {slot: [] for slot in MEAL_SLOT_LABELS},
+    }
+
+
+def _calendar_context(user: User, today: date) -> dict:
+    """Month grid plus the selected day's details (server-rendered, no JS required)."""
+    cal_year = request.args.get('year', type=int)
+    cal_month = request.args.get('month', type=int)
+    sel_day = request.args.get('day')
+
+    # default to current month if not provided
+    if not cal_year or not cal_month:
+        cal_year = today.year
+        cal_month = today.month
+
+    # parse selected day if provided (ISO yyyy-mm-dd) else default to today
+    try:
+        selected_date = datetime.strptime(sel_day, "%Y-%m-%d").date() if sel_day else today
+    except Exception:
+        selected_date = today
+
+    # weights, food macros and workouts for the month, one range query each
+    activity = month_activity(user.id, cal_year, cal_month)
+    calendar_weeks = build_calendar_weeks(cal_year, cal_month, activity)
+
+    # selected-day details come from the month unless the day lies outside it
+    if not activity.covers(selected_date):
+        activity = calendar_activity(user.id, selected_date, selected_date)
+    context = {
+        "cal_year": cal_year,
+        "cal_month": cal_month,
+        "calendar_weeks": calendar_weeks,
+        "selected_date": selected_date,
+        "selected_weight": activity.weights.get(selected_date),
+        "selected_food_calories": None,
+        "selected_food_protein": None,
+        "selected_food_carbs": None,
+        "selected_food_fats": None,
+        "selected_food_items": [],
+        "selected_workouts": [],
+    }
+    selected_macros = activity.macros.get(selected_date)
+    if selected_macros:
+        context["selected_food_calories"] = round(selected_macros["calories"], 1)
+        context["selected_food_protein"] = round(selected_macros["protein"], 1)
+        context["selected_food_carbs"] = round(selected_macros["carbs"], 1)
+        context["selected_food_fats"] = round(selected_macros["fats"], 1)
+
+    for sess in activity.workouts.get(selected_date, []):
+        workout_sets = (
+            WorkoutSet.query
+            .filter_by(session_id=sess.id)
+            .order_by(WorkoutSet.exercise_name.asc(), WorkoutSet.set_number.asc())
+            .all()
+        )
+        context["selected_workouts"].append({
+            'session': sess,
+            'template_name': sess.template.name if sess.template else 'Workout',
+            'duration': _format_duration_display(sess.started_at, sess.completed_at),
+            'sets': workout_sets,
+        })
+    return context
+
+
+def _profile_context(user: User, today: date) -> dict:
+    latest_weight_lbs = _latest_weight_lbs(user)
+
+    height_feet = None
+    height_inches = None
+    if user.height_cm:
+        try:
+            total_inches = float(user.height_cm) / 2.54
+            height_feet = int(total_inches // 12)
+            remaining_inches = total_inches - (height_feet * 12)
+            height_inches = round(remaining_inches)
+            if height_inches == 12:
+                height_feet += 1
+                height_inches = 0
+        except (TypeError, ValueError):
+            height_feet = None
+            height_inches = None
+
+    recent_weights = (
+        Progress.query
+        .filter_by(user_id=user.id)
+        .order_by(Progress.date.desc())
+        .limit(10)
+        .all()
+    )
+    return {
+        "activity_levels": ACTIVITY_LEVELS,
+        "latest_weight_lbs": latest_weight_lbs,
+        "height_feet": height_feet,
+        "height_inches": height_inches,
+        "goal_weight_lbs": _kg_to_pounds(user.goal_weight_kg),
+        "profile_bmr": _calculate_bmr(user.gender, _pounds_to_kg(latest_weight_lbs), user.height_cm, user.age),
+        "recent_weights": recent_weights,
+    }
+
+
+# ``view`` values with their own tab; anything else renders today's log.
+DASHBOARD_VIEWS = {
+    "calendar": _calendar_context,
+    "profile": _profile_context,
+}
+
 
 @member_bp.route("/dashboard", methods=["GET", "POST"])
 @login_required
@@ -214,25 +384,9 @@ def dashboard():
         flash("Please log in as a member.", "danger")
         return redirect(url_for("auth.login_member"))
 
+    # Targets are stored by update_info, log_weight and the trainer's client
+    # page when their inputs change, so rendering the dashboard never writes.
     user = current_user
-    if user:
-        latest_weight = _latest_weight_lbs(user)
-        maintenance, goal = _calculate_calorie_targets(user, weight_lbs=latest_weight)
-        user.maintenance_calories = maintenance if maintenance is not None else None
-        user.calorie_goal = goal if goal is not None else None
-        db.session.commit()
-        db.session.refresh(user)
-    has_any_messages = False
-    has_unread_messages = False
-    if user and user.trainer_id:
-        unread = Message.query.filter_by(client_id=user.id, read_at=None).first()
-        has_unread_messages = unread is not None
-        if has_unread_messages:
-            has_any_messages = True
-        else:
-            has_any_messages = (
-                Message.query.filter_by(client_id=user.id).first() is not None
-            )
     today = _today_eastern()
     search_results = []
 
@@ -246,7 +400,7 @@ def dashboard():
         # If user just types a name and clicks Add → use top match
         # -----------------------------
         if not food_id and search_query:
-            top_result = Food.query.filter(Food.name.ilike(f"%{search_query}%")).first()
+            top_result = first_food_match(search_query)
             if top_result:
                 food_id = top_result.id
 
@@ -279,10 +433,14 @@ def dashboard():
                     food_id=food.id,
                     quantity=grams,  # store actual grams
                     unit="g",
+                    entered_quantity=quantity,
+                    entered_unit=unit_input,
                     log_date=today
                 )
+                log.fill_macros(food)
                 db.session.add(log)
                 db.session.commit()
+                quick_food_cache.record_log(user.id, log, food)
 
                 flash(f"Added {quantity} {unit_input} of {food.name}!", "success")
 
@@ -295,346 +453,30 @@ def dashboard():
         # Search foods without adding
         # -----------------------------
         elif search_query:
-            search_results = Food.query.filter(Food.name.ilike(f"%{search_query}%")).limit(10).all()
+            search_results = search_food_index(search_query, limit=10)
             if not search_results:
                 flash("No matching foods found.", "warning")
         else:
             flash("Please enter a food name to search.", "warning")
 
-    # -----------------------------
-    # Fetch today's logs + compute totals (default view)
-    # -----------------------------
-    user_food_logs = UserFoodLog.query.filter_by(user_id=user.id, log_date=today).all()
-    totals = _calculate_daily_totals(user.id, today)
-    macro_targets = _user_macro_targets(user)
-    calorie_goal_value = macro_targets["calories"] or user.calorie_goal or 2000
-
-    if user.trainer_id:
-        trainer_meals = (
-            TrainerMeal.query
-            .filter(
-                or_(
-                    TrainerMeal.member_id == user.id,
-                    TrainerMeal.member_id.is_(None),
-                    and_(
-                        TrainerMeal.trainer_id == user.trainer_id
-                    )
-                )
-            )
-            .order_by(TrainerMeal.meal_slot.asc(), TrainerMeal.name.asc())
-            .all()
-        )
-    else:
-        trainer_meals = (
-            TrainerMeal.query
-            .filter(TrainerMeal.member_id == user.id)
-            .order_by(TrainerMeal.meal_slot.asc(), TrainerMeal.name.asc())
-            .all()
-        )
-    meal_plan = group_meals_by_slot(trainer_meals) if trainer_meals else {slot: [] for slot in MEAL_SLOT_LABELS}
-    member_meals = (
-        MemberMeal.query
-        .filter_by(user_id=user.id)
-        .order_by(MemberMeal.meal_slot.asc(), MemberMeal.name.asc())
-        .all()
-    )
-    member_meal_plan = group_meals_by_slot(member_meals) if member_meals else {slot: [] for slot in MEAL_SLOT_LABELS}
-
-    # ----------
-    # Calendar support (server-rendered, no JS required)
-    # If the client requested view=calendar we will compute calendar_weeks
-    # and selected_date so the template can render a full month with
-    # per-day weight and food calorie summaries.
-    # ----------
     view = request.args.get('view')
-    cal_year = request.args.get('year', type=int)
-    cal_month = request.args.get('month', type=int)
-    sel_day = request.args.get('day')
-
-    selected_date = None
-    calendar_weeks = None
-    selected_weight = None
-    selected_food_calories = None
-    selected_food_protein = None
-    selected_food_carbs = None
-    selected_food_fats = None
-    selected_workouts = []
-
-    workout_sessions = (
-        WorkoutSession.query
-        .filter_by(user_id=user.id)
-        .order_by(WorkoutSession.started_at.desc())
-        .all()
-    )
-
-    if view == 'calendar':
-        # default to current month if not provided
-        if not cal_year or not cal_month:
-            cal_year = today.year
-            cal_month = today.month
-
-        # parse selected day if provided (ISO yyyy-mm-dd) else default to today
-        try:
-            selected_date = datetime.strptime(sel_day, "%Y-%m-%d").date() if sel_day else today
-        except Exception:
-            selected_date = today
-
-        workout_map = {}
-        for sess in workout_sessions:
-            dt_value = getattr(sess, 'completed_at', None) or getattr(sess, 'started_at', None)
-            if not dt_value:
-                continue
-            try:
-                day = _eastern_date(dt_value)
-            except Exception:
-                day = None
-            if not day:
-                continue
-            workout_map.setdefault(day, []).append(sess)
-
-        def _build_calendar_weeks(year, month, user_obj):
-            weeks = []
-            cal = _calendar.Calendar(firstweekday=6)  # start on Sunday
-            for week in cal.monthdatescalendar(year, month):
-                week_list = []
-                for d in week:
-                    in_month = (d.month == month)
-                    if not in_month:
-                        week_list.append({'iso': '', 'day': '', 'in_month': False, 'data': None})
-                        continue
-
-                    iso = d.strftime('%Y-%m-%d')
-
-                    # weight: pick most-recent Progress/WeightLog entry for that date
-                    weight_val = None
-                    try:
-                        # compute per-macro totals for selected day
-                        rows = Progress.query.filter_by(user_id=user_obj.id).all()
-                        day_rows = []
-                        for r in rows:
-                            dt = getattr(r, 'date', None) or getattr(r, 'log_date', None)
-                            compare_date = _eastern_date(dt)
-                            match = (compare_date == d)
-                            if match:
-                                day_rows.append(r)
-                        if day_rows:
-                            def _ord_key(x):
-                                return getattr(x, 'created_at', None) or getattr(x, 'id', 0)
-                            weight_entry = max(day_rows, key=_ord_key)
-                            weight_val = float(getattr(weight_entry, 'weight')) if getattr(weight_entry, 'weight', None) is not None else None
-                    except Exception:
-                        weight_val = None
-
-                    # food calories: sum UserFoodLog.quantity (grams) scaled by food.calories per serving
-                    food_calories = None
-                    try:
-                        # robust per-row date matching (support Date and DateTime columns)
-                        all_fls = UserFoodLog.query.filter_by(user_id=user_obj.id).all()
-                        fls = []
-                        for f in all_fls:
-                            dt = getattr(f, 'date', None) or getattr(f, 'log_date', None)
-                            compare_date = _eastern_date(dt)
-                            match = (compare_date == d)
-                            if match:
-                                fls.append(f)
-
-                        if fls:
-                            total_cals = 0.0
-                            total_protein = 0.0
-                            total_carbs = 0.0
-                            total_fats = 0.0
-                            for fl in fls:
-                                if getattr(fl, 'food', None):
-                                    grams_logged = fl.quantity_in_grams() if hasattr(fl, 'quantity_in_grams') else getattr(fl, 'quantity', 0)
-                                    scaled = scale_food_nutrients(fl.food, grams_logged)
-                                    total_cals += scaled["calories"]
-                                    total_protein += scaled["protein"]
-                                    total_carbs += scaled["carbs"]
-                                    total_fats += scaled["fats"]
-
-                            food_calories = round(total_cals, 1) if total_cals else None
-                            food_protein = round(total_protein, 1) if total_protein else None
-                            food_carbs = round(total_carbs, 1) if total_carbs else None
-                            food_fats = round(total_fats, 1) if total_fats else None
-                        else:
-                            food_calories = None
-                            food_protein = None
-                            food_carbs = None
-                            food_fats = None
-                    except Exception:
-                        food_calories = None
-                        items = []
-
-                    workouts_for_day = []
-                    for sess in workout_map.get(d, []):
-                        workouts_for_day.append({
-                            'id': sess.id,
-                            'template': sess.template.name if getattr(sess, 'template', None) else None,
-                            'duration': _format_duration_display(sess.started_at, sess.completed_at),
-                        })
-
-                    data = {
-                        'weight': weight_val,
-                        'food': {
-                            'calories': food_calories,
-                            'protein': food_protein if 'food_protein' in locals() else None,
-                            'carbs': food_carbs if 'food_carbs' in locals() else None,
-                            'fats': food_fats if 'food_fats' in locals() else None,
-                        } if (food_calories or (('food_protein' in locals() and food_protein) or ('food_carbs' in locals() and food_carbs) or ('food_fats' in locals() and food_fats))) else None,
-                        'workouts': workouts_for_day if workouts_for_day else None,
-                    }
-
-                    week_list.append({'iso': iso, 'day': d.day, 'in_month': True, 'data': data})
-                weeks.append(week_list)
-            return weeks
-
-        calendar_weeks = _build_calendar_weeks(cal_year, cal_month, user)
-
-        # selected-day details: weight and totals for the selected_date
-        try:
-            # selected weight (robust match)
-            sel_weight = None
-            try:
-                rows = Progress.query.filter_by(user_id=user.id).all()
-                day_rows = []
-                for r in rows:
-                    dt = getattr(r, 'date', None) or getattr(r, 'log_date', None)
-                    compare_date = _eastern_date(dt)
-                    if compare_date == selected_date:
-                        day_rows.append(r)
-                if day_rows:
-                    def _ord_key(x):
-                        return getattr(x, 'created_at', None) or getattr(x, 'id', 0)
-                    weight_entry = max(day_rows, key=_ord_key)
-                    sel_weight = float(getattr(weight_entry, 'weight')) if getattr(weight_entry, 'weight', None) is not None else None
-            except Exception:
-                sel_weight = None
-            selected_weight = sel_weight
-
-            # selected food totals (robust per-row matching)
-            try:
-                all_fls = UserFoodLog.query.filter_by(user_id=user.id).all()
-                tot = 0.0
-                total_protein = 0.0
-                total_carbs = 0.0
-                total_fats = 0.0
-                matched_any = False
-                for fl in all_fls:
-                    dt = getattr(fl, 'date', None) or getattr(fl, 'log_date', None)
-                    compare_date = _eastern_date(dt)
-                    if compare_date != selected_date:
-                        continue
-                    if getattr(fl, 'food', None):
-                        grams_logged = fl.quantity_in_grams() if hasattr(fl, 'quantity_in_grams') else getattr(fl, 'quantity', 0)
-                        scaled = scale_food_nutrients(fl.food, grams_logged)
-                        tot += scaled["calories"]
-                        total_protein += scaled["protein"]
-                        total_carbs += scaled["carbs"]
-                        total_fats += scaled["fats"]
-                        matched_any = True
-                if matched_any:
-                    selected_food_calories = round(tot, 1)
-                    selected_food_protein = round(total_protein, 1)
-                    selected_food_carbs = round(total_carbs, 1)
-                    selected_food_fats = round(total_fats, 1)
-                else:
-                    selected_food_calories = None
-                    selected_food_protein = None
-                    selected_food_carbs = None
-                    selected_food_fats = None
-                selected_food_items = []
-            except Exception:
-                selected_food_calories = None
-                selected_food_items = []
-                selected_food_protein = None
-                selected_food_carbs = None
-                selected_food_fats = None
-
-            try:
-                selected_workouts = []
-                for sess in workout_map.get(selected_date, []):
-                    workout_sets = (
-                        WorkoutSet.query
-                        .filter_by(session_id=sess.id)
-                        .order_by(WorkoutSet.exercise_name.asc(), WorkoutSet.set_number.asc())
-                        .all()
-                    )
-                    selected_workouts.append({
-                        'session': sess,
-                        'template_name': sess.template.name if sess.template else 'Workout',
-                        'duration': _format_duration_display(sess.started_at, sess.completed_at),
-                        'sets': workout_sets,
-                    })
-            except Exception:
-                selected_workouts = []
-        except Exception:
-            selected_weight = None
-            selected_food_calories = None
-
-    latest_weight_lbs = _latest_weight_lbs(user)
-    goal_weight_lbs = _kg_to_pounds(user.goal_weight_kg)
-
-    height_feet = None
-    height_inches = None
-    if user.height_cm:
-        try:
-            total_inches = float(user.height_cm) / 2.54
-            height_feet = int(total_inches // 12)
-            remaining_inches = total_inches - (height_feet * 12)
-            height_inches = round(remaining_inches)
-            if height_inches == 12:
-                height_feet += 1
-                height_inches = 0
-        except (TypeError, ValueError):
-            height_feet = None
-            height_inches = None
-
-    profile_bmr = _calculate_bmr(user.gender, _pounds_to_kg(latest_weight_lbs), user.height_cm, user.age)
-    recent_weights = []
-    if view == 'profile':
-        recent_weights = (
-            Progress.query
-            .filter_by(user_id=user.id)
-            .order_by(Progress.date.desc())
-            .limit(10)
-            .all()
-        )
+    view_context = DASHBOARD_VIEWS.get(view, _today_context)
+    macro_targets = _user_macro_targets(user)
+    has_any_messages, has_unread_messages = _message_flags(user)
 
     return render_template(
         "dashboard-member.html",
         user=user,
-        user_food_logs=user_food_logs,
-        totals=totals,
+        view=view,
         search_results=search_results,
         UNIT_TO_GRAMS=UNIT_TO_GRAMS,
-        # calendar context (may be None when not requested)
-        view=view,
-        cal_year=cal_year,
-        cal_month=cal_month,
-        calendar_weeks=calendar_weeks,
-        selected_date=selected_date,
-        selected_weight=selected_weight,
-        selected_food_calories=selected_food_calories,
-        selected_food_protein=selected_food_protein if 'selected_food_protein' in locals() else None,
-        selected_food_carbs=selected_food_carbs if 'selected_food_carbs' in locals() else None,
-        selected_food_fats=selected_food_fats if 'selected_food_fats' in locals() else None,
-        selected_food_items=selected_food_items if 'selected_food_items' in locals() else [],
-        selected_workouts=selected_workouts,
-        activity_levels=ACTIVITY_LEVELS,
-        latest_weight_lbs=latest_weight_lbs,
-        height_feet=height_feet,
-        height_inches=height_inches,
-        goal_weight_lbs=goal_weight_lbs,
-        profile_bmr=profile_bmr,
-        recent_weights=recent_weights,
         macro_targets=macro_targets,
-        calorie_goal_value=calorie_goal_value,
-        meal_plan=meal_plan,
+        calorie_goal_value=macro_targets["calories"] or user.calorie_goal or 2000,
         meal_slot_labels=MEAL_SLOT_LABELS,
-        member_meal_plan=member_meal_plan,
         today=today,
         has_unread_messages=has_unread_messages,
         has_any_messages=has_any_messages,
+        **view_context(user, today),
     )
 
 
@@ -648,15 +490,13 @@ UNIT_TO_GRAMS = {
     "cup": 240
 }
 def _calculate_daily_totals(user_id: int, target_date: date) -> dict:
-    logs = UserFoodLog.query.filter_by(user_id=user_id, log_date=target_date).all()
-    totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0}
-
-    for log in logs:
-        scaled = scale_food_nutrients(log.food, log.quantity_in_grams())
-        totals["calories"] += scaled["calories"]
-        totals["protein"] += scaled["protein"]
-        totals["carbs"] += scaled["carbs"]
-        totals["fat"] += scaled["fats"]
+    logged = daily_totals(user_id, target_date)
+    totals = {
+        "calories": logged["calories"],
+        "protein": logged["protein"],
+        "carbs": logged["carbs"],
+        "fat": logged["fats"],
+    }
 
     totals = {key: round(value, 1) for key, value in totals.items()}
     totals["macro_calories"] = round(
@@ -677,27 +517,6 @@ def get_totals():
     return jsonify(totals)
 
 
-def _format_duration_display(started_at, completed_at):
-    start_time = _as_eastern(started_at)
-    if not start_time:
-        return "--"
-    end_time = _as_eastern(completed_at) if completed_at else None
-    if not end_time:
-        end_time = _now_eastern()
-    try:
-        duration = end_time - start_time
-    except Exception:
-        return "--"
-    total_seconds = max(int(duration.total_seconds()), 0)
-    hours, remainder = divmod(total_seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
-    if hours:
-        return f"{hours}h {minutes}m"
-    if minutes:
-        return f"{minutes}m"
-    return f"{seconds}s"
-
-
 def scaled_macros(food: Food, quantity_in_grams: float):
     scaled = scale_food_nutrients(food, quantity_in_grams)
 
@@ -740,35 +559,138 @@ def search_foods():
         quantity = 1
 
     results = []
-    if query:
-        foods = (
-            Food.query
-            .filter(Food.name != None)
-            .filter(Food.name.ilike(f"%{query}%"))
-            .limit(10)
-            .all()
-        )
-        for food in foods:
-            # Scale nutrients using food-specific measure if exists
-            grams_per_unit = UNIT_TO_GRAMS.get(unit.lower(), 1)
-            measure = FoodMeasure.query.filter_by(food_id=food.id, measure_name=unit.lower()).first()
-            if measure:
-                grams_per_unit = measure.grams
+    corrected = None
+    with track_search("member.search_foods", query) as probe:
+        if query:
+            foods = search_food_index(query, limit=10)
+            if not foods:
+                foods, corrected = fuzzy_search_foods(query, limit=10)
+            measures_by_food = measures_for_foods(food.id for food in foods)
+            unit_key = unit.lower()
+            for food in foods:
+                # Scale nutrients using food-specific measure if exists
+                measures = measures_by_food.get(food.id, [])
+                grams_per_unit = UNIT_TO_GRAMS.get(unit_key, 1)
+                for measure in measures:
+                    if (measure["measure_name"] or "").strip().lower() == unit_key:
+                        grams_per_unit = measure["grams"]
+                        break
+
+                quantity_in_grams = quantity * grams_per_unit
+                scaled = scaled_macros(food, quantity_in_grams)
+
+                results.append({
+                    "id": food.id,
+                    "name": food.name,
+                    "calories": round(scaled["calories"], 1),
+                    "protein_g": round(scaled["protein"], 1),
+                    "carbs": round(scaled["carbs"], 1),
+                    "fats": round(scaled["fats"], 1),
+                    "serving_size": food.serving_size,
+                    "serving_unit": food.serving_unit,
+                    "measures": measures,
+                })
+        probe.results = len(results)
+        probe.fallback = corrected is not None
+
+    return jsonify({"results": results, "corrected_query": corrected})
+
+
+# -----------------------------
+# Calendar API
+# -----------------------------
+def _revalidate_private(response):
+    # Per-member data: browsers may keep it but must revalidate each view.
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+@member_bp.route("/api/calendar/<int:year>/<int:month>")
+def calendar_month_api(year: int, month: int):
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"status": "error", "message": "Please log in first."}), 403
+    try:
+        start, end = month_bounds(year, month)
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid month."}), 400
+
+    # The month's aggregates change only with the rows calendar_etag stamps, so
+    # an unchanged month is answered before building the payload.
+    etag = calendar_etag(user_id, start, end)
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        activity = calendar_activity(user_id, start, end)
+        response = jsonify({"status": "success", "year": year, "month": month, "days": month_days(activity)})
+    response.set_etag(etag)
+    return _revalidate_private(response)
+
+
+@member_bp.route("/api/calendar/day/<day>")
+def calendar_day_api(day: str):
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"status": "error", "message": "Please log in first."}), 403
+    try:
+        selected = datetime.strptime(day, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid date."}), 400
+
+    # The detail includes food and template names and the running time of an
+    # unfinished workout, none of which the write stamps cover, so the ETag is
+    # a hash of the body itself; one day's payload is cheap to build.
+    response = jsonify({"status": "success", **day_detail(user_id, selected)})
+    response.add_etag()
+    response.make_conditional(request)
+    return _revalidate_private(response)
+
+
+# -----------------------------
+# Quick Foods API
+# -----------------------------
+@member_bp.route("/quick-foods")
+def quick_foods():
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"status": "error", "message": "Please log in first."}), 403
+
+    payload = quick_food_cache.quick_foods(user_id, _today_eastern())
+    food_ids = {item["food_id"] for items in payload.values() for item in items}
+    measures_by_food = measures_for_foods(food_ids)
+    for items in payload.values():
+        for item in items:
+            item["measures"] = measures_by_food.get(item["food_id"], [])
 
-            quantity_in_grams = quantity * grams_per_unit
-            scaled = scaled_macros(food, quantity_in_grams) 
+    return jsonify({"status": "success", **payload})
 
+
+# -----------------------------
+# Autocomplete Foods API
+# -----------------------------
+@member_bp.route("/autocomplete-foods")
+def autocomplete_foods():
+    """Per-keystroke suggestions; values are per serving rather than scaled."""
+    query = request.args.get("q") or ""
+    results = []
+    with track_search("member.autocomplete_foods", query) as probe:
+        foods = autocomplete_food_index(query, limit=10)
+        measures_by_food = measures_for_foods(food.id for food in foods)
+        for food in foods:
+            serving = scaled_macros(food, food.serving_size or 100)
             results.append({
                 "id": food.id,
                 "name": food.name,
-                "calories": round(scaled["calories"], 1),
-                "protein_g": round(scaled["protein"], 1),
-                "carbs": round(scaled["carbs"], 1),
-                "fats": round(scaled["fats"], 1),
+                "calories": round(serving["calories"], 1),
+                "protein_g": round(serving["protein"], 1),
+                "carbs": round(serving["carbs"], 1),
+                "fats": round(serving["fats"], 1),
                 "serving_size": food.serving_size,
-                "serving_unit": food.serving_unit
+                "serving_unit": food.serving_unit,
+                "measures": measures_by_food.get(food.id, []),
             })
-
+        probe.results = len(results)
     return jsonify({"results": results})
 
 
@@ -791,40 +713,28 @@ def add_meal_to_log(meal_id: int):
         if not member or not member.trainer_id:
             return jsonify({"status": "error", "message": "A trainer is required to use this meal."}), 403
 
-    logs_payload = []
-
-    for ingredient in meal.ingredients:
-        grams = float(ingredient.quantity_grams or 0.0)
-        if grams <= 0:
-            continue
-
-        log = UserFoodLog(
-            user_id=user_id,
-            food_id=ingredient.food_id,
-            quantity=grams,
-            unit="g",
-            log_date=today
-        )
-        db.session.add(log)
-        db.session.flush()
-
-        scaled = scale_food_nutrients(log.food, grams)
-        logs_payload.append({
-            "id": log.id,
-            "food_name": log.food.name if log.food else "Meal Ingredient",
-            "quantity": round(grams, 2),
-            "unit": "g",
-            "calories": round(scaled["calories"], 1),
-            "protein": round(scaled["protein"], 1),
-            "carbs": round(scaled["carbs"], 1),
-            "fats": round(scaled["fats"], 1)
-        })
-
-    if not logs_payload:
+    logged = log_meal(user_id, meal, today)
+    if not logged:
         db.session.rollback()
         return jsonify({"status": "error", "message": "Meal has no ingredients to log."}), 400
 
     db.session.commit()
+    for item in logged:
+        quick_food_cache.record_logged(user_id, item.food_id, item.id, item.name, item.grams)
+
+    logs_payload = [
+        {
+            "id": item.id,
+            "food_name": item.name,
+            "quantity": round(item.grams, 2),
+            "unit": "g",
+            "calories": round(item.macros["calories"], 1),
+            "protein": round(item.macros["protein"], 1),
+            "carbs": round(item.macros["carbs"], 1),
+            "fats": round(item.macros["fats"], 1)
+        }
+        for item in logged
+    ]
 
     totals = _calculate_daily_totals(user_id, today)
     totals["fats"] = totals["fat"]
@@ -868,6 +778,7 @@ def create_member_meal():
     )
 
     try:
+        measure_resolver.preload(item.get("food_id") for item in ingredients_payload)
         for idx, item in enumerate(ingredients_payload):
             food_id = item.get("food_id")
             quantity_raw = item.get("quantity")
@@ -912,6 +823,8 @@ def create_member_meal():
             return jsonify({"status": "error", "message": "Add at least one valid ingredient."}), 400
 
         db.session.add(meal)
+        db.session.flush()
+        refresh_meal_cache(meal)
         db.session.commit()
     except Exception as exc:
         db.session.rollback()
@@ -958,39 +871,29 @@ def add_member_meal_to_log(meal_id: int):
     if not meal:
         return jsonify({"status": "error", "message": "Meal not found."}), 404
 
-    logs_payload = []
-    for ingredient in meal.ingredients:
-        grams = float(ingredient.quantity_grams or 0.0)
-        if grams <= 0:
-            continue
-
-        log = UserFoodLog(
-            user_id=user_id,
-            food_id=ingredient.food_id,
-            quantity=grams,
-            unit="g",
-            log_date=today
-        )
-        db.session.add(log)
-        db.session.flush()
-
-        scaled = scale_food_nutrients(log.food, grams)
-        logs_payload.append({
-            "id": log.id,
-            "food_name": log.food.name if log.food else "Meal Ingredient",
-            "quantity": round(grams, 2),
-            "unit": "g",
-            "calories": round(scaled["calories"], 1),
-            "protein": round(scaled["protein"], 1),
-            "carbs": round(scaled["carbs"], 1),
-            "fats": round(scaled["fats"], 1)
-        })
-
-    if not logs_payload:
+    logged = log_meal(user_id, meal, today)
+    if not logged:
         db.session.rollback()
         return jsonify({"status": "error", "message": "Meal has no ingredients to log."}), 400
 
     db.session.commit()
+    for item in logged:
+        quick_food_cache.record_logged(user_id, item.food_id, item.id, item.name, item.grams)
+
+    logs_payload = [
+        {
+            "id": item.id,
+            "food_name": item.name,
+            "quantity": round(item.grams, 2),
+            "unit": "g",
+            "calories": round(item.macros["calories"], 1),
+            "protein": round(item.macros["protein"], 1),
+            "carbs": round(item.macros["carbs"], 1),
+            "fats": round(item.macros["fats"], 1)
+        }
+        for item in logged
+    ]
+
     totals = _calculate_daily_totals(user_id, today)
     totals["fats"] = totals["fat"]
 
@@ -1060,7 +963,7 @@ def log_food():
             db.session.commit()
             created_food = True
         else:
-            food = Food.query.filter(Food.name.ilike(f"%{search_name}%")).first()
+            food = first_food_match(search_name)
             if not food:
                 return jsonify({"status": "error", "message": "No matching foods found."}), 404
 
@@ -1080,12 +983,15 @@ def log_food():
         food_id=food.id,
         quantity=grams,
         unit="g",
+        entered_quantity=quantity,
+        entered_unit=unit_input,
         log_date=today
     )
+    scaled = log.fill_macros(food)
     db.session.add(log)
     db.session.commit()
+    quick_food_cache.record_log(user_id, log, food)
 
-    scaled = scale_food_nutrients(food, grams)
     totals = _calculate_daily_totals(user_id, today)
     totals["fats"] = totals["fat"]
 
@@ -1260,7 +1166,8 @@ def log_weight():
     log_entry = Progress(user_id=user.id, date=entry_datetime, weight=weight_lbs)
     db.session.add(log_entry)
 
-    _update_user_calorie_targets(user, weight_lbs=weight_lbs)
+    # The entry may be back-dated, so derive from the latest weight, not this one.
+    _update_user_calorie_targets(user, weight_lbs=_latest_weight_lbs(user))
     db.session.add(user)
     db.session.commit()
 
@@ -1319,26 +1226,7 @@ def exercise_plan():
 
 @member_bp.route("/get-measures/<int:food_id>")
 def get_measures(food_id):
-    measures = FoodMeasure.query.filter_by(food_id=food_id).all()
-    payload = []
-    seen = set()
-
-    for measure in measures:
-        if not measure or not measure.grams:
-            continue
-        name = (measure.measure_name or "").strip().lower()
-        if not name or name in seen:
-            continue
-        seen.add(name)
-        payload.append({"measure_name": measure.measure_name, "grams": measure.grams})
-
-    # Always ensure grams and ounces are available as fallbacks
-    if "g" not in seen:
-        payload.append({"measure_name": "g", "grams": 1})
-    if "oz" not in seen:
-        payload.append({"measure_name": "oz", "grams": UNIT_TO_GRAMS.get("oz", 28.35)})
-
-    return jsonify({"measures": payload})
+    return jsonify({"measures": measures_for_foods([food_id]).get(food_id, [])})
 
 # -----------------------------
 # Delete Food Log
@@ -1356,6 +1244,7 @@ def delete_food_log(log_id):
     food_name = log.food.name
     db.session.delete(log)
     db.session.commit()
+    quick_food_cache.invalidate(user_id)
 
     return jsonify({"status": "success", "message": f"Removed {food_name} from your log."})
 
@@ -1601,36 +1490,31 @@ def build_member_summary_context(client: User, macro_week_param: Optional[int] =
     week_start_dt = datetime.combine(macro_week_start, datetime.min.time())
     week_end_dt = datetime.combine(macro_week_end + timedelta(days=1), datetime.min.time())
 
-    logs_for_macros = (
+    daily_macro_totals = defaultdict(lambda: {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0})
+    daily_macro_totals.update(daily_logged_macros(client.id, macro_week_start, macro_week_end))
+    # Legacy rows without a log_date fall back to their creation time.
+    undated_logs = (
         UserFoodLog.query
-        .filter(UserFoodLog.user_id == client.id)
         .filter(
-            or_(
-                and_(
-                    UserFoodLog.log_date >= macro_week_start,
-                    UserFoodLog.log_date <= macro_week_end,
-                ),
-                and_(
-                    UserFoodLog.log_date.is_(None),
-                    UserFoodLog.created_at >= week_start_dt,
-                    UserFoodLog.created_at < week_end_dt,
-                ),
-            )
+            UserFoodLog.user_id == client.id,
+            UserFoodLog.log_date.is_(None),
+            UserFoodLog.created_at >= week_start_dt,
+            UserFoodLog.created_at < week_end_dt,
         )
         .all()
     )
-    daily_macro_totals = defaultdict(lambda: {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0})
-    for log in logs_for_macros:
-        day = log.log_date or _eastern_date(log.created_at)
+    undated_scaled = scale_nutrients_batch(
+        [log.food_id for log in undated_logs],
+        [log.quantity_in_grams() for log in undated_logs],
+    )
+    for log, scaled in zip(undated_logs, undated_scaled.tolist()):
+        day = _eastern_date(log.created_at)
         if not day:
             continue
         if day < earliest_week_start or day > current_week_start + timedelta(days=6):
             continue
-        scaled = scale_food_nutrients(log.food, log.quantity_in_grams())
-        daily_macro_totals[day]["calories"] += scaled["calories"]
-        daily_macro_totals[day]["protein"] += scaled["protein"]
-        daily_macro_totals[day]["carbs"] += scaled["carbs"]
-        daily_macro_totals[day]["fats"] += scaled["fats"]
+        for key, value in zip(MACRO_KEYS, scaled):
+            daily_macro_totals[day][key] += value
 
     week_sums = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0}
     for day_offset in range(7):
@@ -10,47 +10,18 @@ from app.models import (
     WorkoutSession,
     WorkoutSet,
 )
+from app.services.exercise_search import FACETS, browse_exercises, search_exercises
+from app.services.search_telemetry import track_search
 from datetime import datetime
 import json
-from sqlalchemy import or_, func
+from sqlalchemy import func
 
 
 template_bp = Blueprint('template', __name__, url_prefix='/templates')
 
 
-def _search_exercises(term):
-    if not term:
-        return []
-
-    like_term = f"%{term}%"
-    rows = (
-        ExerciseCatalog.query
-        .filter(
-            or_(
-                ExerciseCatalog.name.ilike(like_term),
-                ExerciseCatalog.primary_muscles.ilike(like_term),
-                ExerciseCatalog.secondary_muscles.ilike(like_term),
-                ExerciseCatalog.equipment.ilike(like_term),
-                ExerciseCatalog.category.ilike(like_term),
-            )
-        )
-        .order_by(ExerciseCatalog.name.asc())
-        .limit(25)
-        .all()
-    )
-
-    results = []
-    for row in rows:
-        muscle = row.primary_muscles or row.secondary_muscles or (row.category.title() if row.category else None)
-        results.append({
-            "name": row.name,
-            "muscle": muscle,
-            "equipment": row.equipment,
-            "instructions": row.instructions,
-            "image_main": row.image_main,
-            "image_secondary": row.image_secondary,
-        })
-    return results
+def _exercise_filters(args):
+    return {facet: args.getlist(facet) for facet in FACETS if args.getlist(facet)}
 
 
 def _human_duration(started_at, completed_at):
@@ -75,11 +46,26 @@ def _human_duration(started_at, completed_at):
 @login_required
 def search_exercises_api():
     query = (request.args.get('q') or '').strip()
-    if not query:
+    filters = _exercise_filters(request.args)
+    if not query and not filters:
         return jsonify({"results": []})
 
-    matches = _search_exercises(query)
-    return jsonify({"results": matches or []})
+    with track_search("template.search_exercises", query) as probe:
+        matches = search_exercises(query, filters)
+        probe.results = len(matches)
+    return jsonify({"results": matches})
+
+
+@template_bp.route('/api/browse')
+@login_required
+def browse_exercises_api():
+    query = (request.args.get('q') or '').strip()
+    page = request.args.get('page', 1, type=int) or 1
+    per_page = min(max(request.args.get('per_page', 24, type=int) or 24, 1), 100)
+    with track_search("template.browse_exercises", query) as probe:
+        payload = browse_exercises(query, _exercise_filters(request.args), page, per_page)
+        probe.results = payload["total"]
+    return jsonify({"status": "success", **payload})
 
 
 @template_bp.route('/', methods=['GET', 'POST'])
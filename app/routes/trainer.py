@@ -9,7 +9,6 @@ from flask_login import login_required, current_user
 from app import db
 from app.models import (
     User,
-    UserFoodLog,
     Progress,
     AssignedTemplate,
     ExerciseTemplate,
@@ -24,10 +23,13 @@ from app.models import (
 )
 from app.services.nutrition import (
     convert_to_grams,
+    measure_resolver,
     serialize_meal,
     group_meals_by_slot,
+    refresh_meal_cache,
     MEAL_SLOT_LABELS,
 )
+from app.services.daily_nutrition import logged_macros_by_user
 from app.routes.member import build_member_summary_context
 from sqlalchemy import or_, func
 import pytz
@@ -50,14 +52,12 @@ def dashboard_trainer():
         .all()
     )
 
+    macros_by_member = logged_macros_by_user((member.id for member in members), today)
+
     clients = []
     for member in members:
         totals = {key: 0.0 for key in ("calories", "protein", "carbs", "fats")}
-        logs = UserFoodLog.query.filter_by(user_id=member.id, log_date=today).all()
-        for log in logs:
-            scaled = log.scaled
-            for key in totals:
-                totals[key] += scaled.get(key, 0)
+        totals.update(macros_by_member.get(member.id, {}))
 
         latest_progress = (
             Progress.query
@@ -184,6 +184,7 @@ def client_detail(member_id):
             mode_changed = client.macro_target_mode != 'grams'
             client.macro_target_mode = 'grams'
             if updated_macros or mode_changed:
+                client.stamp_calorie_targets()
                 db.session.commit()
                 if not is_ajax:
                     flash("Custom macro targets updated.", "success")
@@ -234,6 +235,7 @@ def client_detail(member_id):
             mode_changed = client.macro_target_mode != 'percent'
             client.macro_target_mode = 'percent'
             if ratio_changed or mode_changed:
+                client.stamp_calorie_targets()
                 db.session.commit()
                 if not is_ajax:
                     flash("Macro percentages updated.", "success")
@@ -448,6 +450,7 @@ def client_detail(member_id):
                     flash("Invalid calorie goal value.", "warning")
 
         if updated:
+            client.stamp_calorie_targets()
             db.session.commit()
             flash("Calorie targets updated.", "success")
 
@@ -663,6 +666,17 @@ def client_detail(member_id):
 
 def _build_ingredient_models(food_ids, quantities, units, notes, positions):
     ingredients = []
+    requested_ids = set()
+    for food_id_raw in food_ids:
+        try:
+            requested_ids.add(int(food_id_raw))
+        except (TypeError, ValueError):
+            continue
+    existing_ids = set()
+    if requested_ids:
+        existing_ids = {row[0] for row in db.session.query(Food.id).filter(Food.id.in_(requested_ids))}
+        measure_resolver.preload(existing_ids)
+
     for idx, food_id_raw in enumerate(food_ids):
         if not food_id_raw:
             continue
@@ -671,7 +685,7 @@ def _build_ingredient_models(food_ids, quantities, units, notes, positions):
         except (TypeError, ValueError):
             continue
 
-        if not Food.query.get(food_id):
+        if food_id not in existing_ids:
             flash(f"Food ID {food_id} not found. Ingredient skipped.", "warning")
             continue
 
@@ -754,6 +768,8 @@ def create_meal(member_id=None):
             meal.ingredients.append(ingredient)
 
         db.session.add(meal)
+        db.session.flush()
+        refresh_meal_cache(meal)
         db.session.commit()
 
         flash(f"Meal '{meal.name}' created.", "success")
@@ -822,6 +838,8 @@ def edit_meal(meal_id, member_id=None):
             ingredient.position = idx
             meal.ingredients.append(ingredient)
 
+        db.session.flush()
+        refresh_meal_cache(meal)
         db.session.commit()
         flash(f"Meal '{meal.name}' updated.", "success")
         if member_id:
@@ -0,0 +1,300 @@
+"""Per-member daily macro rollups.
+
+``daily_nutrition`` holds one row per (user_id, date) with the summed macros
+and the number of logs behind them. It is maintained by ``UserFoodLog`` mapper
+events rather than by the routes. Inserts, deletes and edits of a log record a
+delta in ``session.info``. The deltas are applied once per flush, as one
+upsert per member-day on the flush's own connection. The rollup therefore
+commits or rolls back together with the logs, and logging a whole meal
+touches its day once. Every write stamps the row's ``updated_at``, which the
+calendar API uses to tell whether a range of days has changed.
+
+Daily totals are a primary-key read, and weekly or monthly views are a
+range scan over at most a month of rows per member. ``rebuild_daily_nutrition``
+recomputes the table from ``user_food_log`` after bulk edits made outside the
+ORM. It is also exposed as ``scripts/rebuild_daily_nutrition.py``.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import DateTime, event, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, attributes, object_session
+
+from app import db
+from app.models import DailyNutrition, Food, FoodMeasure, UserFoodLog, UNIT_TO_GRAMS
+from app.services.nutrition import MACRO_KEYS, scale_food_nutrients, scale_nutrients_batch
+
+_DELTAS_KEY = "daily_nutrition_deltas"
+_BACKFILL_BATCH = 1000
+
+
+def _empty() -> Dict[str, float]:
+    return dict.fromkeys(MACRO_KEYS, 0.0)
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+def daily_totals(user_id: int, day: date) -> Dict[str, float]:
+    """Return a member's macros for ``day`` (zeros when nothing is logged)."""
+    row = (
+        db.session.query(
+            DailyNutrition.calories,
+            DailyNutrition.protein,
+            DailyNutrition.carbs,
+            DailyNutrition.fats,
+        )
+        .filter(DailyNutrition.user_id == user_id, DailyNutrition.date == day)
+        .first()
+    )
+    if row is None:
+        return _empty()
+    return {name: float(value or 0.0) for name, value in zip(MACRO_KEYS, row)}
+
+
+def daily_logged_macros(user_id: int, start: date, end: date) -> Dict[date, Dict[str, float]]:
+    """Return a member's macros per day from ``start`` to ``end`` inclusive, for days with logs."""
+    rows = (
+        db.session.query(
+            DailyNutrition.date,
+            DailyNutrition.calories,
+            DailyNutrition.protein,
+            DailyNutrition.carbs,
+            DailyNutrition.fats,
+        )
+        .filter(
+            DailyNutrition.user_id == user_id,
+            DailyNutrition.date >= start,
+            DailyNutrition.date <= end,
+            DailyNutrition.log_count > 0,
+        )
+    )
+    return {day: {name: float(value or 0.0) for name, value in zip(MACRO_KEYS, sums)}
+            for day, *sums in rows}
+
+
+def logged_macros_by_user(user_ids: Iterable[int], day: date) -> Dict[int, Dict[str, float]]:
+    """Return each member's macros for ``day``, keyed by user id."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    rows = (
+        db.session.query(
+            DailyNutrition.user_id,
+            DailyNutrition.calories,
+            DailyNutrition.protein,
+            DailyNutrition.carbs,
+            DailyNutrition.fats,
+        )
+        .filter(
+            DailyNutrition.user_id.in_(user_ids),
+            DailyNutrition.date == day,
+            DailyNutrition.log_count > 0,
+        )
+    )
+    return {user_id: {name: float(value or 0.0) for name, value in zip(MACRO_KEYS, sums)}
+            for user_id, *sums in rows}
+
+
+# ---------------------------------------------------------------------------
+# Upkeep
+# ---------------------------------------------------------------------------
+def _scaled_on_connection(connection, log: UserFoodLog) -> Dict[str, float]:
+    """``UserFoodLog.fill_macros`` without touching the session mid-flush."""
+    food = connection.execute(
+        select(Food.calories, Food.protein_g, Food.carbs_g, Food.fats_g,
+               Food.serving_size, Food.grams_per_unit)
+        .where(Food.id == log.food_id)
+    ).first()
+    grams = float(log.quantity or 0.0)
+    unit = (log.unit or "g").lower()
+    if unit != "g":
+        measure_grams = connection.execute(
+            select(FoodMeasure.grams)
+            .where(FoodMeasure.food_id == log.food_id, FoodMeasure.measure_name == unit)
+            .limit(1)
+        ).scalar()
+        grams *= measure_grams or UNIT_TO_GRAMS.get(unit, 1)
+    return scale_food_nutrients(food, grams)
+
+
+def _fill_missing_macros(connection, log: UserFoodLog) -> None:
+    scaled = _scaled_on_connection(connection, log)
+    for name in MACRO_KEYS:
+        setattr(log, name, scaled[name])
+
+
+def _record(log: UserFoodLog, user_id: Optional[int], day: Optional[date],
+            values: Dict[str, Optional[float]], sign: int) -> None:
+    if user_id is None or day is None:
+        return
+    session = object_session(log)
+    if session is None:
+        return
+    deltas = session.info.setdefault(_DELTAS_KEY, {})
+    delta = deltas.setdefault((user_id, day), [0.0, 0.0, 0.0, 0.0, 0])
+    for index, name in enumerate(MACRO_KEYS):
+        delta[index] += sign * float(values.get(name) or 0.0)
+    delta[4] += sign
+
+
+def _current(log: UserFoodLog) -> Dict[str, Optional[float]]:
+    return {name: getattr(log, name) for name in MACRO_KEYS}
+
+
+def _previous(log: UserFoodLog, name: str):
+    history = attributes.get_history(log, name)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(log, name)
+
+
+def apply_delta(connection, user_id: int, day: date, macros: Dict[str, float], count: int) -> None:
+    """Add ``macros`` and ``count`` to one member-day in one upsert where the dialect has one."""
+    table = DailyNutrition.__table__
+    increments = {name: table.c[name] + macros[name] for name in MACRO_KEYS}
+    increments["log_count"] = table.c.log_count + count
+    # Set explicitly: ON CONFLICT updates skip the column's onupdate.
+    increments["updated_at"] = now = datetime.utcnow()
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(table).values(user_id=user_id, date=day, log_count=count, updated_at=now, **macros)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.date],
+            set_=increments,
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        table.update()
+        .where(table.c.user_id == user_id, table.c.date == day)
+        .values(**increments)
+    )
+    if result.rowcount == 0:
+        connection.execute(
+            table.insert().values(user_id=user_id, date=day, log_count=count, updated_at=now, **macros)
+        )
+
+
+@event.listens_for(UserFoodLog, "before_insert")
+def _log_inserting(mapper, connection, target):
+    if target.calories is None and target.food_id:
+        _fill_missing_macros(connection, target)
+
+
+@event.listens_for(UserFoodLog, "after_insert")
+def _log_inserted(mapper, connection, target):
+    _record(target, target.user_id, target.log_date, _current(target), 1)
+
+
+@event.listens_for(UserFoodLog, "before_update")
+def _log_updating(mapper, connection, target):
+    changed = any(attributes.get_history(target, name).has_changes()
+                  for name in ("food_id", "quantity", "unit"))
+    macros_set = any(attributes.get_history(target, name).has_changes() for name in MACRO_KEYS)
+    if (changed and not macros_set) or target.calories is None:
+        _fill_missing_macros(connection, target)
+
+
+@event.listens_for(UserFoodLog, "after_update")
+def _log_updated(mapper, connection, target):
+    tracked = ("user_id", "log_date") + MACRO_KEYS
+    if not any(attributes.get_history(target, name).has_changes() for name in tracked):
+        return
+    previous = {name: _previous(target, name) for name in MACRO_KEYS}
+    _record(target, _previous(target, "user_id"), _previous(target, "log_date"), previous, -1)
+    _record(target, target.user_id, target.log_date, _current(target), 1)
+
+
+@event.listens_for(UserFoodLog, "before_delete")
+def _log_deleting(mapper, connection, target):
+    # Read the values while the row still exists, in case they were expired.
+    values = _current(target)
+    if values["calories"] is None and target.food_id:
+        values = _scaled_on_connection(connection, target)
+    _record(target, target.user_id, target.log_date, values, -1)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_deltas(session, flush_context):
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if not deltas:
+        return
+    connection = session.connection()
+    for (user_id, day), delta in deltas.items():
+        macros = dict(zip(MACRO_KEYS, delta[:4]))
+        apply_delta(connection, user_id, day, macros, delta[4])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_deltas(session):
+    session.info.pop(_DELTAS_KEY, None)
+
+
+# ---------------------------------------------------------------------------
+# Repair
+# ---------------------------------------------------------------------------
+def rebuild_daily_nutrition(user_id: Optional[int] = None) -> int:
+    """Recompute rollups from ``user_food_log`` for one member, or everyone.
+
+    Logs missing stored macros are filled first. Run it while nobody is
+    logging for the affected members: logs committed during the rebuild may
+    be counted twice or not at all. Returns the number of rollup rows written.
+    """
+    scope = [UserFoodLog.user_id == user_id] if user_id is not None else []
+
+    last_id = 0
+    while True:
+        batch = (
+            UserFoodLog.query
+            .filter(*scope, UserFoodLog.calories.is_(None), UserFoodLog.id > last_id)
+            .order_by(UserFoodLog.id)
+            .limit(_BACKFILL_BATCH)
+            .all()
+        )
+        if not batch:
+            break
+        scaled = scale_nutrients_batch(
+            [log.food_id for log in batch],
+            [log.quantity_in_grams() for log in batch],
+        )
+        for log, row in zip(batch, scaled.tolist()):
+            for name, value in zip(MACRO_KEYS, row):
+                setattr(log, name, value)
+        last_id = batch[-1].id
+        db.session.commit()
+
+    rollups = DailyNutrition.query
+    if user_id is not None:
+        rollups = rollups.filter(DailyNutrition.user_id == user_id)
+    rollups.delete(synchronize_session=False)
+
+    totals = (
+        select(
+            UserFoodLog.user_id,
+            UserFoodLog.log_date,
+            func.coalesce(func.sum(UserFoodLog.calories), 0.0),
+            func.coalesce(func.sum(UserFoodLog.protein), 0.0),
+            func.coalesce(func.sum(UserFoodLog.carbs), 0.0),
+            func.coalesce(func.sum(UserFoodLog.fats), 0.0),
+            func.count(UserFoodLog.id),
+            literal(datetime.utcnow(), DateTime),
+        )
+        .where(*scope, UserFoodLog.log_date.isnot(None))
+        .group_by(UserFoodLog.user_id, UserFoodLog.log_date)
+    )
+    table = DailyNutrition.__table__
+    result = db.session.execute(
+        table.insert().from_select(
+            ["user_id", "date", "calories", "protein", "carbs", "fats", "log_count", "updated_at"],
+            totals,
+        )
+    )
+    db.session.commit()
+    return result.rowcount
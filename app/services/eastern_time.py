@@ -0,0 +1,73 @@
+"""US/Eastern day boundaries for member-facing dates.
+
+Members see their logs, weights and workouts by Eastern calendar day, while
+timestamps are stored as naive UTC. ``eastern_date`` maps a stored value to
+its Eastern day; ``utc_bounds`` goes the other way and turns a span of Eastern
+days into the naive UTC range that covers it, so queries can filter on an
+indexed timestamp column instead of loading rows and converting each one.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+EASTERN_TZ = ZoneInfo("America/New_York")
+
+
+def now_eastern() -> datetime:
+    return datetime.now(EASTERN_TZ)
+
+
+def today_eastern() -> date:
+    return now_eastern().date()
+
+
+def as_eastern(dt: Optional[datetime]) -> Optional[datetime]:
+    if not dt:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(EASTERN_TZ)
+
+
+def eastern_date(value: Optional[object]) -> Optional[date]:
+    """Normalize a stored date/datetime value into an Eastern-localized date."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        localized = as_eastern(value)
+        return localized.date() if localized else None
+    return value
+
+
+def utc_bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    """Return naive UTC ``[low, high)`` covering Eastern days ``start`` through ``end``."""
+    low = datetime.combine(start, datetime.min.time(), tzinfo=EASTERN_TZ)
+    high = datetime.combine(end + timedelta(days=1), datetime.min.time(), tzinfo=EASTERN_TZ)
+    return (
+        low.astimezone(timezone.utc).replace(tzinfo=None),
+        high.astimezone(timezone.utc).replace(tzinfo=None),
+    )
+
+
+def format_duration(started_at, completed_at) -> str:
+    """``"1h 5m"`` style duration; a session still running is measured up to now."""
+    start_time = as_eastern(started_at)
+    if not start_time:
+        return "--"
+    end_time = as_eastern(completed_at) if completed_at else None
+    if not end_time:
+        end_time = now_eastern()
+    try:
+        duration = end_time - start_time
+    except Exception:
+        return "--"
+    total_seconds = max(int(duration.total_seconds()), 0)
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m"
+    return f"{seconds}s"
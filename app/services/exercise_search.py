@@ -0,0 +1,236 @@
+"""In-process search over ``ExerciseCatalog``.
+
+The catalog is small (around a thousand rows) and changes only when
+``cache_exercises.upsert_catalog`` runs, so it is held in memory as a
+snapshot. Rows are numbered in name order, and every search token and facet
+value maps to a bitmap (a Python ``int``) of the rows that carry it. A query
+ANDs and ORs a few integers and then walks the lowest set bits, so results
+come out alphabetically without sorting. Facet counts for the browse view are
+popcounts (``int.bit_count``) of those bitmaps.
+
+``upsert_catalog`` rebuilds the snapshot in its own process. Other processes
+notice a changed row count or highest id within ``SIGNATURE_CHECK_SECONDS``.
+They also rebuild every ``MAX_AGE_SECONDS`` to pick up in-place edits that
+leave both unchanged.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import func
+
+from app import db
+from app.models import ExerciseCatalog
+
+FACETS = ("muscle", "equipment", "level", "mechanic", "force", "category")
+SIGNATURE_CHECK_SECONDS = 60.0
+MAX_AGE_SECONDS = 600.0
+DEFAULT_LIMIT = 25
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(*values: Optional[str]) -> set:
+    tokens = set()
+    for value in values:
+        if value:
+            tokens.update(_TOKEN_RE.findall(value.lower()))
+    return tokens
+
+
+def _facet_values(value: Optional[str]) -> List[str]:
+    """Split a comma-joined column ("chest, triceps") into normalized values."""
+    if not value:
+        return []
+    return [part.strip().lower() for part in value.split(",") if part.strip()]
+
+
+def serialize_exercise(row: ExerciseCatalog) -> dict:
+    muscle = row.primary_muscles or row.secondary_muscles or (row.category.title() if row.category else None)
+    return {
+        "id": row.id,
+        "name": row.name,
+        "muscle": muscle,
+        "equipment": row.equipment,
+        "level": row.level,
+        "mechanic": row.mechanic,
+        "force": row.force,
+        "category": row.category,
+        "instructions": row.instructions,
+        "image_main": row.image_main,
+        "image_secondary": row.image_secondary,
+    }
+
+
+class ExerciseIndex:
+    """Immutable snapshot of the catalog with bitmap postings."""
+
+    def __init__(self, rows: Iterable[ExerciseCatalog], signature: Tuple[int, int] = (0, 0)) -> None:
+        self.items: List[dict] = []
+        self.tokens: Dict[str, int] = {}
+        self.facets: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self.signature = signature
+        self.built_at = time.monotonic()
+
+        for position, row in enumerate(sorted(rows, key=lambda r: ((r.name or "").lower(), r.id))):
+            bit = 1 << position
+            self.items.append(serialize_exercise(row))
+            for token in _tokens(row.name, row.primary_muscles, row.secondary_muscles,
+                                 row.equipment, row.category):
+                self.tokens[token] = self.tokens.get(token, 0) | bit
+            facet_values = {
+                "muscle": _facet_values(row.primary_muscles),
+                "equipment": _facet_values(row.equipment),
+                "level": _facet_values(row.level),
+                "mechanic": _facet_values(row.mechanic),
+                "force": _facet_values(row.force),
+                "category": _facet_values(row.category),
+            }
+            for facet, values in facet_values.items():
+                postings = self.facets[facet]
+                for value in values:
+                    postings[value] = postings.get(value, 0) | bit
+        self.all_bits = (1 << len(self.items)) - 1
+        self._sorted_tokens = sorted(self.tokens)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _prefix_bits(self, prefix: str) -> int:
+        """OR together the postings of every token starting with ``prefix``."""
+        bits = 0
+        start = bisect_left(self._sorted_tokens, prefix)
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            bits |= self.tokens[token]
+        return bits
+
+    def match(self, query: Optional[str] = None,
+              filters: Optional[Mapping[str, Iterable[str]]] = None) -> int:
+        """Return the bitmap of rows matching every query token and every facet.
+
+        Query tokens match as prefixes of any indexed word. Several values for
+        one facet are alternatives.
+        """
+        bits = self.all_bits
+        for term in _tokens(query):
+            bits &= self._prefix_bits(term)
+            if not bits:
+                return 0
+        for facet, values in (filters or {}).items():
+            postings = self.facets.get(facet)
+            if postings is None:
+                continue
+            wanted = [value.strip().lower() for value in values if value and value.strip()]
+            if not wanted:
+                continue
+            facet_bits = 0
+            for value in wanted:
+                facet_bits |= postings.get(value, 0)
+            bits &= facet_bits
+            if not bits:
+                return 0
+        return bits
+
+    def rows(self, bits: int, offset: int = 0, limit: Optional[int] = DEFAULT_LIMIT) -> List[dict]:
+        """Return items for the set bits, in name order, after skipping ``offset``."""
+        results: List[dict] = []
+        skipped = 0
+        while bits and (limit is None or len(results) < limit):
+            low = bits & -bits
+            if skipped < offset:
+                skipped += 1
+            else:
+                results.append(self.items[low.bit_length() - 1])
+            bits ^= low
+        return results
+
+    def facet_counts(self, query: Optional[str] = None,
+                     filters: Optional[Mapping[str, Iterable[str]]] = None) -> Dict[str, List[dict]]:
+        """Count matching rows per value of every facet.
+
+        Each facet is counted with its own filter left out, so the counts show
+        what selecting another value of that facet would return.
+        """
+        filters = dict(filters or {})
+        base = self.match(query, filters)
+        counts: Dict[str, List[dict]] = {}
+        for facet in FACETS:
+            if filters.get(facet):
+                others = {key: values for key, values in filters.items() if key != facet}
+                bits = self.match(query, others)
+            else:
+                bits = base
+            values = []
+            if bits:
+                for value, postings in self.facets[facet].items():
+                    count = (bits & postings).bit_count()
+                    if count:
+                        values.append({"value": value, "count": count})
+            values.sort(key=lambda item: (-item["count"], item["value"]))
+            counts[facet] = values
+        return counts
+
+    def search(self, query: Optional[str] = None,
+               filters: Optional[Mapping[str, Iterable[str]]] = None,
+               limit: Optional[int] = DEFAULT_LIMIT) -> List[dict]:
+        return self.rows(self.match(query, filters), limit=limit)
+
+
+_state: Dict[str, object] = {"index": None, "checked_at": 0.0}
+_lock = threading.Lock()
+
+
+def _signature() -> Tuple[int, int]:
+    count, max_id = db.session.query(func.count(ExerciseCatalog.id), func.max(ExerciseCatalog.id)).one()
+    return int(count or 0), int(max_id or 0)
+
+
+def rebuild_index() -> ExerciseIndex:
+    """Load the catalog and swap in a fresh snapshot."""
+    signature = _signature()
+    index = ExerciseIndex(ExerciseCatalog.query.all(), signature)
+    with _lock:
+        _state["index"] = index
+        _state["checked_at"] = time.monotonic()
+    return index
+
+
+def get_index() -> ExerciseIndex:
+    index: Optional[ExerciseIndex] = _state["index"]
+    now = time.monotonic()
+    if index is None or now - index.built_at > MAX_AGE_SECONDS:
+        return rebuild_index()
+    if now - _state["checked_at"] > SIGNATURE_CHECK_SECONDS:
+        _state["checked_at"] = now
+        if _signature() != index.signature:
+            return rebuild_index()
+    return index
+
+
+def search_exercises(query: Optional[str] = None,
+                     filters: Optional[Mapping[str, Iterable[str]]] = None,
+                     limit: Optional[int] = DEFAULT_LIMIT) -> List[dict]:
+    return get_index().search(query, filters, limit)
+
+
+def browse_exercises(query: Optional[str] = None,
+                     filters: Optional[Mapping[str, Iterable[str]]] = None,
+                     page: int = 1, per_page: int = DEFAULT_LIMIT) -> dict:
+    """Return one page of matches plus facet counts for the whole selection."""
+    index = get_index()
+    bits = index.match(query, filters)
+    total = bits.bit_count()
+    page = max(page, 1)
+    return {
+        "results": index.rows(bits, offset=(page - 1) * per_page, limit=per_page),
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": (total + per_page - 1) // per_page,
+        "facets": index.facet_counts(query, filters),
+    }
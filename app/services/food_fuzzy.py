@@ -0,0 +1,132 @@
+"""Spelling correction for food search terms.
+
+"brocoli", "yoghurt" and "chiken" match nothing. Instead of comparing the
+query against every food name, each unknown query term is corrected against
+the vocabulary of words that appear in food names:
+
+1. Padded trigrams of the term select candidate words from a trigram
+   inverted index over the vocabulary. Only the ``CANDIDATE_LIMIT`` words
+   sharing the most trigrams go on to step 2.
+2. Candidates whose Dice trigram similarity reaches ``MIN_SIMILARITY`` are
+   checked with a Levenshtein distance that gives up early once
+   ``max_distance`` is exceeded.
+
+The vocabulary is far smaller than the catalog (tens of thousands of words
+versus hundreds of thousands of names), and every step is bounded. A time
+budget also cuts verification short, so one pathological term cannot stall a
+request.
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+CANDIDATE_LIMIT = 200
+MIN_SIMILARITY = 0.35
+MIN_TERM_LENGTH = 4
+TIME_BUDGET_SECONDS = 0.03
+
+
+def term_grams(term: str) -> Set[str]:
+    """Trigrams of ``term`` padded with ``$`` so short words and edges count."""
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edit_distance(term: str) -> int:
+    return 1 if len(term) <= 5 else 2
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Return the edit distance between ``a`` and ``b``, or ``None`` if above ``max_distance``."""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(a) + 1))
+    for j, char_b in enumerate(b, 1):
+        current = [j]
+        row_min = j
+        for i, char_a in enumerate(a, 1):
+            cost = 0 if char_a == char_b else 1
+            value = min(previous[i] + 1, current[i - 1] + 1, previous[i - 1] + cost)
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return None
+        previous = current
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
+
+
+class TermVocabulary:
+    """Words seen in food names, with document counts and a trigram index."""
+
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._counts
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._counts))
+
+    def add_terms(self, terms: Iterable[str]) -> None:
+        with self._lock:
+            for term in set(terms):
+                if term in self._counts:
+                    self._counts[term] += 1
+                    continue
+                self._counts[term] = 1
+                for gram in term_grams(term):
+                    self._postings.setdefault(gram, set()).add(term)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._postings.clear()
+
+    def suggest(self, term: str, limit: int = 3,
+                deadline: Optional[float] = None) -> List[str]:
+        """Return up to ``limit`` vocabulary words close to ``term``, best first.
+
+        Closer edit distance wins, then trigram similarity, then how many food
+        names use the word.
+        """
+        if len(term) < MIN_TERM_LENGTH:
+            return []
+        grams = term_grams(term)
+        max_distance = max_edit_distance(term)
+
+        with self._lock:
+            overlap: Dict[str, int] = {}
+            for gram in grams:
+                for word in self._postings.get(gram, ()):
+                    overlap[word] = overlap.get(word, 0) + 1
+            shortlist = heapq.nlargest(CANDIDATE_LIMIT, overlap.items(), key=lambda item: item[1])
+            counts = self._counts
+
+            matches: List[Tuple[int, float, int, str]] = []
+            for word, shared in shortlist:
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                # ``$word$`` has len(word) trigrams.
+                similarity = 2.0 * shared / (len(grams) + len(word))
+                if similarity < MIN_SIMILARITY:
+                    continue
+                distance = bounded_levenshtein(term, word, max_distance)
+                if distance is None:
+                    continue
+                matches.append((distance, -similarity, -counts[word], word))
+
+        matches.sort()
+        return [match[3] for match in matches[:limit]]
@@ -0,0 +1,85 @@
+"""Bulk food logging.
+
+Logging a whole meal writes one ``user_food_log`` row per ingredient. The
+rows go in as a single ``INSERT ... RETURNING id`` on SQLite and on
+dialects that can return executemany ids in parameter order (Postgres), and
+as one insert per row otherwise. Macros come from the meal's cached ingredients
+(``refresh_meal_cache``), or from the per-gram profile store for meals
+without a fresh cache, so no ``Food`` row is loaded per ingredient.
+
+Core inserts skip the ``UserFoodLog`` mapper events, so the counters those
+events maintain are updated here, on the same connection: the
+``daily_nutrition`` rollup by the meal's total in one upsert, and
+``food_popularity`` in one upsert. The caller commits.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple
+
+from app import db
+from app.models import UserFoodLog
+from app.services.daily_nutrition import apply_delta
+from app.services.food_ranking import record_bulk_logs
+from app.services.nutrition import MACRO_KEYS, meal_log_items
+
+
+class LoggedFood(NamedTuple):
+    id: int
+    food_id: int
+    name: str
+    grams: float
+    macros: Dict[str, float]
+
+
+def _insert_logs(rows: List[dict]) -> List[int]:
+    """Insert ``rows`` and return their ids in the same order."""
+    table = UserFoodLog.__table__
+    connection = db.session.connection()
+    dialect = connection.dialect
+    if dialect.name == "sqlite" and dialect.insert_returning:
+        # SQLite has no insert sentinel, so sort_by_parameter_order would
+        # fall back to one statement per row. Rowids within one multi-row
+        # INSERT are assigned in VALUES order, so sorting the ids restores it.
+        result = connection.execute(table.insert().values(rows).returning(table.c.id))
+        return sorted(result.scalars())
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = connection.execute(
+            table.insert().returning(table.c.id, sort_by_parameter_order=True),
+            rows,
+        )
+        return list(result.scalars())
+    return [connection.execute(table.insert(), row).inserted_primary_key[0] for row in rows]
+
+
+def log_meal(user_id: int, meal, day: date) -> List[LoggedFood]:
+    """Log every ingredient of ``meal`` (with a positive weight) for ``user_id`` on ``day``."""
+    items = [item for item in meal_log_items(meal) if item["grams"] > 0]
+    if not items:
+        return []
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "food_id": item["food_id"],
+            "quantity": item["grams"],
+            "unit": "g",
+            "log_date": day,
+            "created_at": now,
+            **{key: float(item["macros"][key]) for key in MACRO_KEYS},
+        }
+        for item in items
+    ]
+    ids = _insert_logs(rows)
+
+    totals = {key: sum(row[key] for row in rows) for key in MACRO_KEYS}
+    apply_delta(db.session.connection(), user_id, day, totals, len(rows))
+    record_bulk_logs(db.session, Counter(row["food_id"] for row in rows))
+
+    return [
+        LoggedFood(log_id, item["food_id"], item["name"], item["grams"],
+                   {key: row[key] for key in MACRO_KEYS})
+        for log_id, item, row in zip(ids, items, rows)
+    ]
@@ -0,0 +1,214 @@
+"""Ranking for food search results.
+
+Backends return every match, or a bounded pool of the best matches by
+popularity and index relevance (bm25 / ts_rank). This module orders those candidates by how well the name
+matches the query (exact, then prefix, then word boundary, then anything
+else) plus a popularity bonus based on how often each food has been logged.
+
+Log counts are kept in the ``food_popularity`` table. Each ``UserFoodLog``
+insert bumps its row in the same transaction, so ranking never has to run
+``COUNT(*)`` over the log table. Each process caches the (small) table and
+reloads it periodically. Its own committed logs are applied to the cache
+straight away.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import FoodPopularity, UserFoodLog
+
+TIER_EXACT = 3
+TIER_PREFIX = 2
+TIER_WORD = 1
+TIER_OTHER = 0
+# One tier is worth log1p(count) == 4, i.e. roughly 55 logs.
+POPULARITY_WEIGHT = 0.25
+POPULARITY_REFRESH_SECONDS = 300.0
+# Above this many candidates, score prefix matches and logged foods first and
+# only fall back to scoring everything when they cannot fill the page.
+_PRUNE_THRESHOLD = 2000
+_PENDING_KEY = "food_popularity_pending"
+
+
+def _normalize(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    return " ".join(text.lower().split())
+
+
+def match_tier(query: str, name: str) -> int:
+    """Classify how ``name`` matches ``query``; both must already be normalized."""
+    if name == query:
+        return TIER_EXACT
+    if name.startswith(query):
+        return TIER_PREFIX
+    position = name.find(query)
+    while position > 0:
+        if not name[position - 1].isalnum():
+            return TIER_WORD
+        position = name.find(query, position + 1)
+    return TIER_OTHER
+
+
+def _bonus(count: int) -> float:
+    return POPULARITY_WEIGHT * math.log1p(count)
+
+
+_popularity: Dict[str, object] = {"bonus": {}, "counts": {}, "loaded_at": None}
+_popularity_lock = threading.Lock()
+
+
+def _popularity_state() -> Dict[str, object]:
+    loaded_at = _popularity["loaded_at"]
+    now = time.monotonic()
+    if loaded_at is None or now - loaded_at > POPULARITY_REFRESH_SECONDS:
+        with _popularity_lock:
+            if _popularity["loaded_at"] is None or now - _popularity["loaded_at"] > POPULARITY_REFRESH_SECONDS:
+                rows = db.session.query(FoodPopularity.food_id, FoodPopularity.log_count)
+                counts = {food_id: count for food_id, count in rows if count}
+                _popularity["counts"] = counts
+                _popularity["bonus"] = {food_id: _bonus(count) for food_id, count in counts.items()}
+                _popularity["loaded_at"] = now
+    return _popularity
+
+
+def popularity_counts() -> Dict[int, int]:
+    """Return ``food_id -> log_count``, reloading the cached copy when stale."""
+    return _popularity_state()["counts"]
+
+
+def reset_popularity() -> None:
+    with _popularity_lock:
+        _popularity["counts"] = {}
+        _popularity["bonus"] = {}
+        _popularity["loaded_at"] = None
+
+
+def rank_rows(
+    query: str,
+    rows: Iterable[Tuple[int, str]],
+    limit: Optional[int] = None,
+) -> List[Tuple[int, str]]:
+    """Order ``(food_id, normalized name)`` candidates best first.
+
+    Ties on score go to the shorter name ("egg" before "egg, whole, raw"),
+    then to the lower id.
+    """
+    normalized = _normalize(query)
+    bonus = _popularity_state()["bonus"]
+
+    def sort_key(row):
+        food_id, name = row
+        score = match_tier(normalized, name) + bonus.get(food_id, 0.0)
+        return (-score, len(name), food_id)
+
+    rows = list(rows)
+    if limit is None:
+        return sorted(rows, key=sort_key)
+    if len(rows) > _PRUNE_THRESHOLD:
+        # Anything else scores at most TIER_WORD, so if the page fills with
+        # better scores the remaining rows cannot change it.
+        strong = [row for row in rows if row[0] in bonus or row[1].startswith(normalized)]
+        best = heapq.nsmallest(limit, strong, key=sort_key)
+        if len(best) == limit and -sort_key(best[-1])[0] > TIER_WORD:
+            return best
+    return heapq.nsmallest(limit, rows, key=sort_key)
+
+
+# ---------------------------------------------------------------------------
+# Counter upkeep
+# ---------------------------------------------------------------------------
+def increment_popularity(connection, food_id: int, amount: int = 1) -> None:
+    """Add ``amount`` to a food's log count in one upsert where the dialect has one."""
+    table = FoodPopularity.__table__
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else pg_insert
+        stmt = insert(table).values(food_id=food_id, log_count=amount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.food_id],
+            set_={"log_count": table.c.log_count + amount},
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        table.update()
+        .where(table.c.food_id == food_id)
+        .values(log_count=table.c.log_count + amount)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(food_id=food_id, log_count=amount))
+
+
+def increment_popularity_many(connection, amounts: Dict[int, int]) -> None:
+    """``increment_popularity`` for several foods, as one statement where the dialect allows."""
+    amounts = {food_id: amount for food_id, amount in amounts.items() if food_id and amount}
+    if not amounts:
+        return
+    table = FoodPopularity.__table__
+    dialect = connection.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        for food_id, amount in amounts.items():
+            increment_popularity(connection, food_id, amount)
+        return
+
+    insert = sqlite_insert if dialect == "sqlite" else pg_insert
+    stmt = insert(table).values([
+        {"food_id": food_id, "log_count": amount} for food_id, amount in amounts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.food_id],
+        set_={"log_count": table.c.log_count + stmt.excluded.log_count},
+    )
+    connection.execute(stmt)
+
+
+def _queue_cache_update(session: Optional[Session], amounts: Dict[int, int]) -> None:
+    if session is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for food_id, amount in amounts.items():
+        pending[food_id] = pending.get(food_id, 0) + amount
+
+
+def record_bulk_logs(session: Session, amounts: Dict[int, int]) -> None:
+    """Count logs inserted without the ORM (which skips ``_log_inserted``)."""
+    increment_popularity_many(session.connection(), amounts)
+    _queue_cache_update(session, amounts)
+
+
+@event.listens_for(UserFoodLog, "after_insert")
+def _log_inserted(mapper, connection, target):
+    if not target.food_id:
+        return
+    increment_popularity(connection, target.food_id)
+    _queue_cache_update(object_session(target), {target.food_id: 1})
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or _popularity["loaded_at"] is None:
+        return
+    with _popularity_lock:
+        counts = _popularity["counts"]
+        bonus = _popularity["bonus"]
+        for food_id, amount in pending.items():
+            counts[food_id] = counts.get(food_id, 0) + amount
+            bonus[food_id] = _bonus(counts[food_id])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,619 @@
+"""Food name search.
+
+``Food.name.ilike('%q%')`` cannot use an index, so every search scanned the
+whole ``food`` table. Searches now go through a backend chosen from the
+database dialect:
+
+* SQLite with the ``food_fts`` FTS5 table and Postgres with the GIN-indexed
+  ``food.search_vector`` column (both created by migration ``3f1c2a9d7e4b``)
+  answer token-prefix queries from the database index.
+* Anywhere else, or before that migration runs, an in-process trigram
+  inverted index of food names is used instead: a query intersects the
+  posting sets of its trigrams and verifies the few survivors, so the cost
+  follows the number of matches rather than the size of the catalog.
+
+Backends only produce candidates; ``app.services.food_ranking`` orders them
+by match quality and popularity. When a query finds nothing,
+``fuzzy_search_foods`` corrects misspelled terms against the vocabulary of
+words in food names (``app.services.food_fuzzy``) and searches again.
+
+Autocomplete (``autocomplete``) sits in front of whichever backend is active:
+a bounded LRU cache keyed by normalized prefix holds each prefix's candidate
+set, and a keystroke that only extends a cached prefix filters those
+candidates in Python instead of searching again.
+
+The in-memory index is built on first use (``warm_index`` builds it eagerly at
+process start) and kept current by SQLAlchemy events: committed inserts,
+renames and deletes of ``Food`` rows are applied as soon as the transaction
+commits. Rows written by other processes (import scripts, other gunicorn
+workers) are picked up by a periodic catch-up on ids above the indexed
+high-water mark.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from flask import current_app
+from sqlalchemy import event, inspect as sa_inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import Food
+from app.services.food_fuzzy import TIME_BUDGET_SECONDS, TermVocabulary
+from app.services.food_ranking import rank_rows
+
+GRAM_SIZE = 3
+REFRESH_INTERVAL_SECONDS = 30.0
+_BUILD_BATCH_SIZE = 5000
+_PENDING_KEY = "food_search_pending"
+_WORD_RE = re.compile(r"\w+")
+# Database backends hand at most this many index hits to the ranking stage;
+# very broad prefixes ("ch") would otherwise score a large share of the
+# catalog per keystroke. The pool is ordered before it is cut, so it holds the
+# best candidates rather than an arbitrary subset.
+RANK_POOL_SIZE = 1000
+# Autocomplete keeps up to this many candidates per prefix. A prefix with more
+# matches is cached for repeats but never narrowed, since its set is partial.
+AUTOCOMPLETE_POOL_SIZE = 500
+AUTOCOMPLETE_CACHE_SIZE = 512
+AUTOCOMPLETE_MIN_LENGTH = 2
+
+
+def normalize_query(text: Optional[str]) -> str:
+    """Lowercase and collapse whitespace so queries and names compare alike."""
+    if not text:
+        return ""
+    return " ".join(text.lower().split())
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class FoodSearchIndex:
+    """Trigram inverted index mapping name fragments to food ids."""
+
+    def __init__(self) -> None:
+        self._names: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._lock = threading.RLock()
+        self.high_water = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, food_id: int, name: Optional[str]) -> None:
+        normalized = normalize_query(name)
+        with self._lock:
+            self._discard(food_id)
+            if not normalized:
+                return
+            self._names[food_id] = normalized
+            for gram in _grams(normalized):
+                self._postings.setdefault(gram, set()).add(food_id)
+            if food_id > self.high_water:
+                self.high_water = food_id
+
+    def add_many(self, rows: Iterable[Tuple[int, Optional[str]]]) -> None:
+        with self._lock:
+            for food_id, name in rows:
+                self.add(food_id, name)
+
+    def remove(self, food_id: int) -> None:
+        with self._lock:
+            self._discard(food_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._names.clear()
+            self._postings.clear()
+            self.high_water = 0
+
+    def _discard(self, food_id: int) -> None:
+        previous = self._names.pop(food_id, None)
+        if previous is None:
+            return
+        for gram in _grams(previous):
+            posting = self._postings.get(gram)
+            if posting is None:
+                continue
+            posting.discard(food_id)
+            if not posting:
+                del self._postings[gram]
+
+    def name(self, food_id: int) -> Optional[str]:
+        return self._names.get(food_id)
+
+    def candidates(self, query: str) -> Set[int]:
+        """Return ids whose normalized name contains ``query`` as a substring."""
+        normalized = normalize_query(query)
+        if not normalized:
+            return set()
+
+        with self._lock:
+            if len(normalized) < GRAM_SIZE:
+                # Too short for a trigram lookup; these are rare and match broadly.
+                return {fid for fid, name in self._names.items() if normalized in name}
+
+            postings = []
+            for gram in _grams(normalized):
+                posting = self._postings.get(gram)
+                if not posting:
+                    return set()
+                postings.append(posting)
+            postings.sort(key=len)
+            matched = set(postings[0])
+            for posting in postings[1:]:
+                matched &= posting
+                if not matched:
+                    return set()
+            # Trigram overlap is necessary but not sufficient; confirm the substring.
+            return {fid for fid in matched if normalized in self._names[fid]}
+
+    def search(self, query: str, limit: Optional[int] = 10) -> List[int]:
+        """Return matching ids in ascending id order, like the old table scan."""
+        ids = sorted(self.candidates(query))
+        return ids[:limit] if limit is not None else ids
+
+    def rows(self, query: str) -> List[Tuple[int, str]]:
+        """Return ``(id, normalized name)`` for every match."""
+        with self._lock:
+            return [(fid, self._names[fid]) for fid in self.candidates(query)]
+
+
+_index = FoodSearchIndex()
+_state = {"built": False, "checked_at": 0.0}
+_build_lock = threading.Lock()
+
+
+def _load_rows(min_id: int = 0) -> Iterable[Tuple[int, Optional[str]]]:
+    query = (
+        db.session.query(Food.id, Food.name)
+        .filter(Food.name.isnot(None))
+        .filter(Food.id > min_id)
+        .order_by(Food.id.asc())
+    )
+    return query.yield_per(_BUILD_BATCH_SIZE)
+
+
+def get_index() -> FoodSearchIndex:
+    """Return the process-wide index, building or catching it up as needed."""
+    now = time.monotonic()
+    if not _state["built"]:
+        with _build_lock:
+            if not _state["built"]:
+                _index.clear()
+                _index.add_many(_load_rows())
+                _state["built"] = True
+                _state["checked_at"] = now
+    elif now - _state["checked_at"] > REFRESH_INTERVAL_SECONDS:
+        _state["checked_at"] = now
+        _index.add_many(_load_rows(_index.high_water))
+    return _index
+
+
+_vocabulary = TermVocabulary()
+_vocab_state = {"built": False, "checked_at": 0.0, "high_water": 0}
+_vocab_lock = threading.Lock()
+
+
+def _add_vocabulary_rows(rows: Iterable[Tuple[int, Optional[str]]]) -> None:
+    for food_id, name in rows:
+        _vocabulary.add_terms(query_terms(name))
+        if food_id > _vocab_state["high_water"]:
+            _vocab_state["high_water"] = food_id
+
+
+def get_vocabulary() -> TermVocabulary:
+    """Return the process-wide term vocabulary, built and caught up like the index."""
+    now = time.monotonic()
+    if not _vocab_state["built"]:
+        with _vocab_lock:
+            if not _vocab_state["built"]:
+                _vocabulary.clear()
+                _vocab_state["high_water"] = 0
+                _add_vocabulary_rows(_load_rows())
+                _vocab_state["built"] = True
+                _vocab_state["checked_at"] = now
+    elif now - _vocab_state["checked_at"] > REFRESH_INTERVAL_SECONDS:
+        _vocab_state["checked_at"] = now
+        with _vocab_lock:
+            _add_vocabulary_rows(_load_rows(_vocab_state["high_water"]))
+    return _vocabulary
+
+
+def query_terms(query: Optional[str]) -> List[str]:
+    """Split a query into word tokens that are safe to embed in FTS syntax."""
+    return _WORD_RE.findall(normalize_query(query))
+
+
+class MemoryIndexBackend:
+    """Substring search served from the in-process trigram index."""
+
+    name = "memory"
+    # Every match is returned, so there is no pool bound.
+    pool_size = None
+
+    def candidate_rows(self, query: str) -> List[Tuple[int, str]]:
+        """Return ``(id, normalized name)`` for every match."""
+        return get_index().rows(query)
+
+    @staticmethod
+    def matcher(query: str) -> Callable[[str], bool]:
+        normalized = normalize_query(query)
+        return lambda name: normalized in normalize_query(name)
+
+
+class SqliteFtsBackend:
+    """Token-prefix search over the ``food_fts`` FTS5 table."""
+
+    name = "sqlite_fts5"
+    pool_size = RANK_POOL_SIZE
+    # The pool is cut from the top of the index order (most logged first,
+    # then bm25, which favours short names), not from rowid order.
+    _sql = text(
+        "SELECT food_fts.rowid, food_fts.name FROM food_fts "
+        "LEFT JOIN food_popularity ON food_popularity.food_id = food_fts.rowid "
+        "WHERE food_fts MATCH :match "
+        "ORDER BY coalesce(food_popularity.log_count, 0) DESC, food_fts.rank "
+        "LIMIT :pool"
+    )
+
+    def candidate_rows(self, query: str) -> List[Tuple[int, str]]:
+        terms = query_terms(query)
+        if not terms:
+            return []
+        match = " ".join(f'"{term}"*' for term in terms)
+        rows = db.session.execute(self._sql, {"match": match, "pool": self.pool_size})
+        return [(row[0], normalize_query(row[1])) for row in rows]
+
+    @staticmethod
+    def matcher(query: str) -> Callable[[str], bool]:
+        return _token_prefix_matcher(query)
+
+
+class PostgresFtsBackend:
+    """Token-prefix search over the GIN-indexed ``food.search_vector`` column."""
+
+    name = "postgres_tsvector"
+    pool_size = RANK_POOL_SIZE
+    # As for FTS5: most logged first, then ts_rank normalized by document
+    # length (flag 1) so short names come before long ones.
+    _sql = text(
+        "SELECT food.id, food.name FROM food "
+        "CROSS JOIN to_tsquery('simple', :tsquery) AS q "
+        "LEFT JOIN food_popularity ON food_popularity.food_id = food.id "
+        "WHERE food.search_vector @@ q "
+        "ORDER BY coalesce(food_popularity.log_count, 0) DESC, "
+        "ts_rank(food.search_vector, q, 1) DESC "
+        "LIMIT :pool"
+    )
+
+    def candidate_rows(self, query: str) -> List[Tuple[int, str]]:
+        terms = query_terms(query)
+        if not terms:
+            return []
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        rows = db.session.execute(self._sql, {"tsquery": tsquery, "pool": self.pool_size})
+        return [(row[0], normalize_query(row[1])) for row in rows]
+
+    @staticmethod
+    def matcher(query: str) -> Callable[[str], bool]:
+        return _token_prefix_matcher(query)
+
+
+def _fold(text: str) -> str:
+    """Strip diacritics the way the ``unicode61 remove_diacritics`` tokenizer does."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _token_prefix_matcher(query: str) -> Callable[[str], bool]:
+    """Mirror the FTS backends in Python: every term prefixes some name token."""
+    terms = [_fold(term) for term in query_terms(query)]
+
+    def matches(name: str) -> bool:
+        tokens = query_terms(_fold(name or ""))
+        return all(any(token.startswith(term) for token in tokens) for term in terms)
+
+    return matches
+
+
+_backends: Dict[str, object] = {}
+
+
+def _database_backend(engine):
+    dialect = engine.dialect.name
+    inspector = sa_inspect(engine)
+    if dialect == "sqlite" and inspector.has_table("food_fts"):
+        return SqliteFtsBackend()
+    if dialect == "postgresql":
+        columns = {column["name"] for column in inspector.get_columns("food")}
+        if "search_vector" in columns:
+            return PostgresFtsBackend()
+    return None
+
+
+def get_backend():
+    """Pick the search backend for the current engine (cached per database URL).
+
+    ``FOOD_SEARCH_BACKEND`` may force ``memory``; the default ``auto`` prefers
+    the database index when the migration that creates it has been applied.
+    """
+    engine = db.engine
+    key = str(engine.url)
+    backend = _backends.get(key)
+    if backend is None:
+        if current_app.config.get("FOOD_SEARCH_BACKEND", "auto") != "memory":
+            backend = _database_backend(engine)
+        backend = backend or MemoryIndexBackend()
+        _backends[key] = backend
+    return backend
+
+
+def warm_index(app) -> None:
+    """Build the in-memory index (when it is the active backend) and the
+    spelling vocabulary eagerly."""
+    with app.app_context():
+        try:
+            if get_backend().name == MemoryIndexBackend.name:
+                get_index()
+            get_vocabulary()
+        except SQLAlchemyError:
+            db.session.rollback()
+            app.logger.warning("Food search index not built; database not ready.")
+
+
+def reset_index() -> None:
+    """Drop the in-memory index and backend choice so both are re-evaluated."""
+    with _build_lock:
+        _index.clear()
+        _state["built"] = False
+    with _vocab_lock:
+        _vocabulary.clear()
+        _vocab_state["built"] = False
+    _backends.clear()
+    _prefix_cache.clear()
+
+
+def search_food_ids(query: str, limit: Optional[int] = 10) -> List[int]:
+    rows = rank_rows(query, get_backend().candidate_rows(query), limit)
+    return [food_id for food_id, _ in rows]
+
+
+def search_foods(query: str, limit: Optional[int] = 10) -> List[Food]:
+    """Return ``Food`` rows matching ``query``, best match first."""
+    ids = search_food_ids(query, limit)
+    if not ids:
+        return []
+    rows = {food.id: food for food in Food.query.filter(Food.id.in_(ids)).all()}
+    return [rows[food_id] for food_id in ids if food_id in rows]
+
+
+def first_food_match(query: str) -> Optional[Food]:
+    foods = search_foods(query, limit=1)
+    return foods[0] if foods else None
+
+
+def corrected_queries(query: str, alternatives: int = 3) -> List[str]:
+    """Return respellings of ``query`` with unknown terms replaced, best first.
+
+    Known words, and words too short to correct reliably, are kept as typed.
+    Returns nothing when no term could be corrected.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    vocabulary = get_vocabulary()
+    deadline = time.perf_counter() + TIME_BUDGET_SECONDS
+    options = []
+    corrected = False
+    for term in terms:
+        suggestions = [] if term in vocabulary else vocabulary.suggest(term, alternatives, deadline)
+        if suggestions:
+            corrected = True
+            options.append(suggestions)
+        else:
+            options.append([term])
+    if not corrected:
+        return []
+    # The n-th alternative takes each term's n-th suggestion (or its last one).
+    queries = []
+    for rank in range(max(len(choices) for choices in options)):
+        candidate = " ".join(choices[min(rank, len(choices) - 1)] for choices in options)
+        if candidate not in queries:
+            queries.append(candidate)
+    return queries
+
+
+def fuzzy_search_ids(query: str, limit: Optional[int] = 10) -> Tuple[List[int], Optional[str]]:
+    """Search again with misspellings corrected; returns ids and the query used."""
+    for candidate in corrected_queries(query):
+        ids = search_food_ids(candidate, limit)
+        if ids:
+            return ids, candidate
+    return [], None
+
+
+def fuzzy_search_foods(query: str, limit: Optional[int] = 10) -> Tuple[List[Food], Optional[str]]:
+    ids, corrected = fuzzy_search_ids(query, limit)
+    if not ids:
+        return [], None
+    rows = {food.id: food for food in Food.query.filter(Food.id.in_(ids)).all()}
+    return [rows[food_id] for food_id in ids if food_id in rows], corrected
+
+
+# ---------------------------------------------------------------------------
+# Prefix autocomplete
+# ---------------------------------------------------------------------------
+class _CacheEntry:
+    # ``candidates`` are already ranked for the entry's own prefix.
+    __slots__ = ("candidates", "complete", "created_at")
+
+    def __init__(self, candidates: List[Tuple[int, str]], complete: bool) -> None:
+        self.candidates = candidates
+        self.complete = complete
+        self.created_at = time.monotonic()
+
+
+class PrefixCache:
+    """Bounded LRU of normalized prefix -> ``(id, name)`` candidates in rank order.
+
+    ``complete`` entries hold every match for their prefix, so any longer query
+    that extends the prefix can be answered by filtering them. Other entries
+    hold only the top of the backend's ordered pool; they answer repeats of
+    their own prefix but are never narrowed, since a longer query's best
+    matches may lie outside the pool.
+    """
+
+    def __init__(self, max_entries: int = AUTOCOMPLETE_CACHE_SIZE,
+                 ttl: float = REFRESH_INTERVAL_SECONDS) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, backend_name: str, prefix: str) -> Optional[_CacheEntry]:
+        key = (backend_name, prefix)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.created_at > self.ttl:
+                # Foods written by other processes only reach us via expiry.
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, backend_name: str, prefix: str, entry: _CacheEntry, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                # The catalog changed while this entry was being computed.
+                return
+            key = (backend_name, prefix)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+
+_prefix_cache = PrefixCache()
+
+
+def _fetch_candidates(backend, query: str) -> _CacheEntry:
+    rows = backend.candidate_rows(query)
+    # A full pool means the backend stopped early, and more than
+    # AUTOCOMPLETE_POOL_SIZE rows means rank_rows drops some: either way the
+    # entry is partial.
+    truncated = backend.pool_size is not None and len(rows) >= backend.pool_size
+    complete = not truncated and len(rows) <= AUTOCOMPLETE_POOL_SIZE
+    return _CacheEntry(rank_rows(query, rows, AUTOCOMPLETE_POOL_SIZE), complete)
+
+
+def autocomplete_ids(query: str, limit: int = 10) -> List[int]:
+    """Return ranked food ids for a partially typed query, using the prefix cache.
+
+    Popularity moves slowly, so cached orderings are served as they are until
+    the entry is evicted or expires.
+    """
+    prefix = normalize_query(query)
+    if len(prefix) < AUTOCOMPLETE_MIN_LENGTH:
+        return []
+
+    backend = get_backend()
+    entry = _prefix_cache.get(backend.name, prefix)
+    if entry is None:
+        generation = _prefix_cache.generation
+        for end in range(len(prefix) - 1, AUTOCOMPLETE_MIN_LENGTH - 1, -1):
+            shorter = _prefix_cache.get(backend.name, prefix[:end].rstrip())
+            if shorter is None:
+                continue
+            # Shorter prefixes match even more rows, so once the nearest cached
+            # one is partial none of them can be narrowed.
+            if shorter.complete:
+                matches = backend.matcher(prefix)
+                narrowed = [(fid, name) for fid, name in shorter.candidates if matches(name)]
+                entry = _CacheEntry(rank_rows(prefix, narrowed), complete=True)
+            break
+        if entry is None:
+            entry = _fetch_candidates(backend, prefix)
+        _prefix_cache.put(backend.name, prefix, entry, generation)
+
+    if not entry.candidates:
+        # Misspelled; corrections are time-bounded but not cached.
+        return fuzzy_search_ids(prefix, limit)[0]
+    return [food_id for food_id, _ in entry.candidates[:limit]]
+
+
+def autocomplete(query: str, limit: int = 10) -> List[Food]:
+    ids = autocomplete_ids(query, limit)
+    if not ids:
+        return []
+    rows = {food.id: food for food in Food.query.filter(Food.id.in_(ids)).all()}
+    return [rows[food_id] for food_id in ids if food_id in rows]
+
+
+# ---------------------------------------------------------------------------
+# Keep the index in step with committed Food writes
+# ---------------------------------------------------------------------------
+def _queue_change(target: Food, removed: bool = False) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    pending[target.id] = None if removed else target.name
+
+
+@event.listens_for(Food, "after_insert")
+def _food_inserted(mapper, connection, target):
+    _queue_change(target)
+
+
+@event.listens_for(Food, "after_update")
+def _food_updated(mapper, connection, target):
+    if sa_inspect(target).attrs.name.history.has_changes():
+        _queue_change(target)
+
+
+@event.listens_for(Food, "after_delete")
+def _food_deleted(mapper, connection, target):
+    _queue_change(target, removed=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    _prefix_cache.clear()
+    if _vocab_state["built"]:
+        with _vocab_lock:
+            _add_vocabulary_rows((fid, name) for fid, name in pending.items() if name is not None)
+    if not _state["built"]:
+        return
+    for food_id, name in pending.items():
+        if name is None:
+            _index.remove(food_id)
+        else:
+            _index.add(food_id, name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,275 @@
+"""Month aggregates for the member calendar.
+
+The calendar used to load a member's whole ``Progress`` history once per day
+cell and filter it in Python, so a month view read the entire history about
+sixty times. ``calendar_activity`` instead reads one span of Eastern days
+with three range-bounded queries:
+
+* weights: ``Progress`` rows whose timestamp falls in the span; per day, the
+  most recently added row wins, as before;
+* food macros: the ``daily_nutrition`` rollup (``daily_logged_macros``);
+* workouts: ``WorkoutSession`` rows completed (or, if unfinished, started) in
+  the span, with their templates joined in.
+
+The weight and workout reads use the ``(user_id, date)`` and
+``(user_id, started_at)`` indexes from migration ``b3e8d5a1f6c7``.
+
+``calendar_weeks`` lays the maps out as the Sunday-first grid the dashboard
+template renders, so the work per view follows one month of data rather than
+days × lifetime rows.
+
+The JSON calendar API serves the same data as ``month_days`` (compact per-day
+aggregates) and ``day_detail`` (foods and workout sets for one day, loaded on
+demand). ``calendar_etag`` fingerprints a month from the latest write stamps
+of its rollup rows and workouts, plus row counts and highest ids so inserts and
+deletes show up too. It costs three index range scans, so an unchanged month
+can be answered with a 304 without building the payload. Day details carry
+food and template names and running durations that no stamp covers, so the
+day endpoint hashes its payload instead.
+"""
+from __future__ import annotations
+
+import calendar as _calendar
+import hashlib
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import DailyNutrition, Progress, UserFoodLog, WorkoutSession, WorkoutSet
+from app.services.daily_nutrition import daily_logged_macros
+from app.services.eastern_time import as_eastern, eastern_date, format_duration, utc_bounds
+
+# Bump when the API payloads change shape, so cached responses are refetched.
+_PAYLOAD_VERSION = 1
+
+
+class CalendarActivity(NamedTuple):
+    start: date
+    end: date
+    weights: Dict[date, Optional[float]]
+    macros: Dict[date, Dict[str, float]]
+    workouts: Dict[date, List[WorkoutSession]]
+
+    def covers(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    return date(year, month, 1), date(year, month, _calendar.monthrange(year, month)[1])
+
+
+def _weights(user_id: int, start: date, end: date) -> Dict[date, Optional[float]]:
+    low, high = utc_bounds(start, end)
+    rows = (
+        db.session.query(Progress.id, Progress.date, Progress.weight)
+        .filter(Progress.user_id == user_id, Progress.date >= low, Progress.date < high)
+        .order_by(Progress.id)
+    )
+    weights: Dict[date, Optional[float]] = {}
+    for _, stamp, weight in rows:
+        day = eastern_date(stamp)
+        # Ordered by id, so the entry added last for a day wins.
+        try:
+            weights[day] = float(weight) if weight is not None else None
+        except (TypeError, ValueError):
+            weights[day] = None
+    return weights
+
+
+def _workouts_in(user_id: int, start: date, end: date) -> tuple:
+    low, high = utc_bounds(start, end)
+    happened_at = func.coalesce(WorkoutSession.completed_at, WorkoutSession.started_at)
+    return (
+        WorkoutSession.user_id == user_id,
+        happened_at >= low,
+        happened_at < high,
+        # Redundant, but lets the (user_id, started_at) index bound the scan.
+        or_(WorkoutSession.started_at < high, WorkoutSession.started_at.is_(None)),
+    )
+
+
+def _workouts(user_id: int, start: date, end: date) -> Dict[date, List[WorkoutSession]]:
+    sessions = (
+        WorkoutSession.query
+        .options(joinedload(WorkoutSession.template))
+        .filter(*_workouts_in(user_id, start, end))
+        .order_by(WorkoutSession.started_at.desc())
+        .all()
+    )
+    grouped: Dict[date, List[WorkoutSession]] = defaultdict(list)
+    for sess in sessions:
+        day = eastern_date(sess.completed_at or sess.started_at)
+        if day is not None:
+            grouped[day].append(sess)
+    return dict(grouped)
+
+
+def calendar_activity(user_id: int, start: date, end: date) -> CalendarActivity:
+    """Weights, macros and workouts per Eastern day from ``start`` to ``end`` inclusive."""
+    return CalendarActivity(
+        start,
+        end,
+        _weights(user_id, start, end),
+        daily_logged_macros(user_id, start, end),
+        _workouts(user_id, start, end),
+    )
+
+
+def month_activity(user_id: int, year: int, month: int) -> CalendarActivity:
+    return calendar_activity(user_id, *month_bounds(year, month))
+
+
+def _day_food(macros: Optional[Dict[str, float]]) -> Optional[Dict[str, Optional[float]]]:
+    if not macros:
+        return None
+    food = {name: (round(macros[name], 1) if macros[name] else None)
+            for name in ("calories", "protein", "carbs", "fats")}
+    return food if any(food.values()) else None
+
+
+def calendar_weeks(year: int, month: int, activity: CalendarActivity) -> List[List[dict]]:
+    """Sunday-first weeks of day cells; days outside ``month`` are blank cells."""
+    weeks = []
+    cal = _calendar.Calendar(firstweekday=6)  # start on Sunday
+    for week in cal.monthdatescalendar(year, month):
+        week_list = []
+        for d in week:
+            if d.month != month:
+                week_list.append({'iso': '', 'day': '', 'in_month': False, 'data': None})
+                continue
+            workouts = [
+                {
+                    'id': sess.id,
+                    'template': sess.template.name if sess.template else None,
+                    'duration': format_duration(sess.started_at, sess.completed_at),
+                }
+                for sess in activity.workouts.get(d, [])
+            ]
+            week_list.append({
+                'iso': d.strftime('%Y-%m-%d'),
+                'day': d.day,
+                'in_month': True,
+                'data': {
+                    'weight': activity.weights.get(d),
+                    'food': _day_food(activity.macros.get(d)),
+                    'workouts': workouts or None,
+                },
+            })
+        weeks.append(week_list)
+    return weeks
+
+
+def calendar_etag(user_id: int, start: date, end: date) -> str:
+    """Fingerprint of every write behind ``user_id``'s calendar from ``start`` to ``end``."""
+    low, high = utc_bounds(start, end)
+    # Weights are only ever inserted, so the count and highest id cover them.
+    weights = (
+        db.session.query(func.count(Progress.id), func.max(Progress.id))
+        .filter(Progress.user_id == user_id, Progress.date >= low, Progress.date < high)
+        .one()
+    )
+    # Every food log insert, edit or delete stamps its day's rollup row.
+    food = (
+        db.session.query(func.count(), func.max(DailyNutrition.updated_at))
+        .filter(
+            DailyNutrition.user_id == user_id,
+            DailyNutrition.date >= start,
+            DailyNutrition.date <= end,
+        )
+        .one()
+    )
+    workouts = (
+        db.session.query(
+            func.count(WorkoutSession.id),
+            func.max(WorkoutSession.id),
+            func.max(WorkoutSession.updated_at),
+        )
+        .filter(*_workouts_in(user_id, start, end))
+        .one()
+    )
+    key = repr((_PAYLOAD_VERSION, user_id, start, end, tuple(weights), tuple(food), tuple(workouts)))
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def month_days(activity: CalendarActivity) -> Dict[str, dict]:
+    """Per-day aggregates keyed by ISO date, for days with a weight, food or workouts."""
+    days = {}
+    for day in sorted(activity.weights.keys() | activity.macros.keys() | activity.workouts.keys()):
+        entry = {}
+        weight = activity.weights.get(day)
+        if weight is not None:
+            entry["weight"] = round(weight, 1)
+        food = _day_food(activity.macros.get(day))
+        if food:
+            entry["food"] = food
+        if activity.workouts.get(day):
+            entry["workouts"] = len(activity.workouts[day])
+        if entry:
+            days[day.isoformat()] = entry
+    return days
+
+
+def _isoformat(value) -> Optional[str]:
+    localized = as_eastern(value)
+    return localized.isoformat() if localized else None
+
+
+def day_detail(user_id: int, day: date) -> dict:
+    """Weight, macros, food logs and workout sets for one Eastern day."""
+    activity = calendar_activity(user_id, day, day)
+    sessions = activity.workouts.get(day, [])
+
+    sets_by_session: Dict[int, List[dict]] = defaultdict(list)
+    if sessions:
+        workout_sets = (
+            WorkoutSet.query
+            .filter(WorkoutSet.session_id.in_([sess.id for sess in sessions]))
+            .order_by(WorkoutSet.exercise_name.asc(), WorkoutSet.set_number.asc())
+        )
+        for workout_set in workout_sets:
+            sets_by_session[workout_set.session_id].append({
+                "exercise": workout_set.exercise_name,
+                "set_number": workout_set.set_number,
+                "reps": workout_set.reps,
+                "weight": workout_set.weight,
+            })
+
+    logs = (
+        UserFoodLog.query
+        .options(joinedload(UserFoodLog.food))
+        .filter(UserFoodLog.user_id == user_id, UserFoodLog.log_date == day)
+        .order_by(UserFoodLog.created_at.asc(), UserFoodLog.id.asc())
+    )
+    weight = activity.weights.get(day)
+    return {
+        "date": day.isoformat(),
+        "weight": round(weight, 1) if weight is not None else None,
+        "food": _day_food(activity.macros.get(day)),
+        "foods": [
+            {
+                "id": log.id,
+                "food_id": log.food_id,
+                "name": log.food.name if log.food else None,
+                "quantity": round(log.quantity or 0.0, 1),
+                "unit": log.unit,
+                **log.scaled,
+            }
+            for log in logs
+        ],
+        "workouts": [
+            {
+                "id": sess.id,
+                "template_id": sess.template_id,
+                "template": sess.template.name if sess.template else None,
+                "started_at": _isoformat(sess.started_at),
+                "completed_at": _isoformat(sess.completed_at),
+                "duration": format_duration(sess.started_at, sess.completed_at),
+                "sets": sets_by_session.get(sess.id, []),
+            }
+            for sess in sessions
+        ],
+    }
@@ -1,9 +1,20 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, Optional, Tuple
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from pathlib import Path
 import json
+import threading
+import time
 
+import numpy as np
+
+from sqlalchemy import event, inspect as sa_inspect, select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import db
 from app.models import (
     Food,
     FoodMeasure,
@@ -78,17 +89,20 @@ def _normalize_unit(unit: Optional[str]) -> str:
     return unit.strip().lower()
 
 
-def _candidate_units(unit: str) -> Iterable[str]:
-    """Generate a set of candidate keys for matching FoodMeasure names."""
+def _candidate_units(unit: str) -> List[str]:
+    """Generate candidate keys for matching FoodMeasure names, exact spelling first."""
     base = _normalize_unit(unit)
     if not base:
         return []
 
-    candidates = {base}
-    if base.endswith("s"):
-        candidates.add(base[:-1])
-    candidates.add(base.replace(".", ""))
-    candidates.add(base.replace(" ", ""))
+    candidates = [base]
+    for variant in (
+        base[:-1] if base.endswith("s") else None,
+        base.replace(".", ""),
+        base.replace(" ", ""),
+    ):
+        if variant and variant not in candidates:
+            candidates.append(variant)
     return candidates
 
 
@@ -139,6 +153,59 @@ def scale_food_nutrients(food: Optional[Food], quantity_in_grams: float) -> Dict
     }
 
 
+MACRO_KEYS = ("calories", "protein", "carbs", "fats")
+_PROFILE_COLUMNS = attrgetter("calories", "protein_g", "carbs_g", "fats_g", "serving_size", "grams_per_unit")
+_EMPTY_PROFILE = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def per_gram_profiles(foods: Sequence[Optional[Food]]) -> np.ndarray:
+    """Return an ``(n, 4)`` array of calories, protein, carbs and fats per gram.
+
+    Uses the same rules as ``scale_food_nutrients``. The serving weight falls
+    back from ``serving_size`` to ``grams_per_unit`` to 100 g, and calories
+    come from the macros whenever those are non-zero. ``foods`` may be
+    ``Food`` instances or rows with the same column names; ``None`` gives a
+    zero row.
+    """
+    raw = np.array(
+        [_PROFILE_COLUMNS(food) if food is not None else _EMPTY_PROFILE for food in foods],
+        dtype=float,
+    ).reshape(-1, 6)
+    calories, protein, carbs, fats, serving_size, grams_per_unit = np.nan_to_num(raw).T
+
+    serving = np.where(serving_size > 0, serving_size, np.where(grams_per_unit > 0, grams_per_unit, 100.0))
+    macro_calories = protein * 4 + carbs * 4 + fats * 9
+    calories = np.where(macro_calories != 0, macro_calories, calories)
+    return np.column_stack((calories, protein, carbs, fats)) / serving[:, None]
+
+
+def scale_foods_batch(foods: Sequence[Optional[Food]], grams: Sequence[float]) -> np.ndarray:
+    """Scale ``foods[i]`` to ``grams[i]`` for every row; returns an ``(n, 4)`` array in ``MACRO_KEYS`` order.
+
+    Each distinct food object is profiled once, so repeated foods cost an index lookup.
+    """
+    positions: Dict[int, int] = {}
+    distinct: List[Optional[Food]] = []
+    for food in foods:
+        if id(food) not in positions:
+            positions[id(food)] = len(distinct)
+            distinct.append(food)
+    inverse = np.fromiter((positions[id(food)] for food in foods), dtype=np.intp, count=len(foods))
+    grams = np.asarray(grams, dtype=float).reshape(-1)
+    return per_gram_profiles(distinct)[inverse] * grams[:, None]
+
+
+def scale_nutrients_batch(food_ids: Sequence[int], grams: Sequence[float]) -> np.ndarray:
+    """Scale many ``(food_id, grams)`` pairs using the cached per-gram profiles."""
+    return food_profiles.profiles(food_ids) * np.asarray(grams, dtype=float).reshape(-1)[:, None]
+
+
+def batch_totals(scaled: np.ndarray) -> Dict[str, float]:
+    """Sum a batch from ``scale_foods_batch`` / ``scale_nutrients_batch`` into a macro dict."""
+    sums = scaled.sum(axis=0) if len(scaled) else np.zeros(len(MACRO_KEYS))
+    return {key: float(value) for key, value in zip(MACRO_KEYS, sums)}
+
+
 def derive_macro_targets(
     calorie_target: Optional[float],
     custom_protein_g: Optional[float],
@@ -182,30 +249,310 @@ def derive_macro_targets(
     return macros
 
 
+class _FoodUnits:
+    """One food's unit -> grams table, resolved with ``convert_to_grams`` precedence."""
+
+    __slots__ = ("name", "measures", "overrides", "resolved", "loaded_at")
+
+    def __init__(self, name: Optional[str], measures: Dict[str, Tuple[float, int]]) -> None:
+        self.name = name
+        self.measures = measures
+        self.overrides = MEASURE_OVERRIDES.get((name or "").lower(), {})
+        self.loaded_at = time.monotonic()
+        self.resolved: Dict[str, Optional[Tuple[float, Optional[int]]]] = {}
+        # Precompute the spellings callers actually send: every measure name and
+        # its plural, the generic units, and this food's override units.
+        aliases = list(measures) + [f"{unit}s" for unit in measures]
+        aliases += list(UNIT_TO_GRAMS) + list(self.overrides)
+        for alias in aliases:
+            self.resolve(alias)
+
+    def resolve(self, unit: str) -> Optional[Tuple[float, Optional[int]]]:
+        """Return ``(grams per unit, FoodMeasure id or None)`` for a normalized unit."""
+        if unit in self.resolved:
+            return self.resolved[unit]
+        candidates = _candidate_units(unit)
+        result: Optional[Tuple[float, Optional[int]]] = None
+        for candidate in candidates:
+            if candidate in self.measures:
+                result = self.measures[candidate]
+                break
+        if result is None and unit in UNIT_TO_GRAMS:
+            result = (float(UNIT_TO_GRAMS[unit]), None)
+        if result is None:
+            for candidate in candidates:
+                grams = self.overrides.get(candidate)
+                if grams:
+                    result = (float(grams), None)
+                    break
+        self.resolved[unit] = result
+        return result
+
+
+class MeasureResolver:
+    """Process-wide cache of per-food unit tables.
+
+    Each food's measures are loaded once (``preload`` batches many foods into
+    two queries), so a conversion is a dictionary lookup instead of a
+    ``FoodMeasure`` query per candidate spelling. Entries are dropped when a
+    ``FoodMeasure`` or the food's name changes in this process, and expire
+    after ``ttl`` seconds to pick up writes from other processes.
+    """
+
+    def __init__(self, max_foods: int = 4096, ttl: float = 600.0) -> None:
+        self.max_foods = max_foods
+        self.ttl = ttl
+        self._tables: "OrderedDict[int, _FoodUnits]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fresh(self, food_id: int) -> Optional[_FoodUnits]:
+        table = self._tables.get(food_id)
+        if table is None or time.monotonic() - table.loaded_at > self.ttl:
+            return None
+        self._tables.move_to_end(food_id)
+        return table
+
+    def preload(self, food_ids: Iterable[int]) -> None:
+        ids = set()
+        for food_id in food_ids:
+            try:
+                ids.add(int(food_id))
+            except (TypeError, ValueError):
+                continue
+        with self._lock:
+            missing = [food_id for food_id in ids if self._fresh(food_id) is None]
+        if not missing:
+            return
+
+        names = dict(db.session.query(Food.id, Food.name).filter(Food.id.in_(missing)))
+        measures: Dict[int, Dict[str, Tuple[float, int]]] = {food_id: {} for food_id in missing}
+        rows = (
+            db.session.query(FoodMeasure.id, FoodMeasure.food_id, FoodMeasure.measure_name, FoodMeasure.grams)
+            .filter(FoodMeasure.food_id.in_(missing))
+            .order_by(FoodMeasure.id.asc())
+        )
+        for measure_id, food_id, measure_name, grams in rows:
+            key = _normalize_unit(measure_name)
+            if key and grams and key not in measures[food_id]:
+                measures[food_id][key] = (float(grams), measure_id)
+
+        with self._lock:
+            for food_id in missing:
+                self._tables[food_id] = _FoodUnits(names.get(food_id), measures[food_id])
+                self._tables.move_to_end(food_id)
+            while len(self._tables) > self.max_foods:
+                self._tables.popitem(last=False)
+
+    def _table(self, food_id: int) -> _FoodUnits:
+        with self._lock:
+            table = self._fresh(food_id)
+        if table is None:
+            self.preload([food_id])
+            with self._lock:
+                table = self._tables[food_id]
+        return table
+
+    def resolve(self, food_id: int, unit: Optional[str]) -> Optional[Tuple[float, Optional[int]]]:
+        normalized = _normalize_unit(unit)
+        if not normalized:
+            return None
+        return self._table(int(food_id)).resolve(normalized)
+
+    def grams_per_unit(self, food_id: int, unit: Optional[str]) -> Optional[float]:
+        resolved = self.resolve(food_id, unit)
+        return resolved[0] if resolved else None
+
+    def invalidate(self, food_id: Optional[int] = None) -> None:
+        with self._lock:
+            if food_id is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(food_id, None)
+
+
+measure_resolver = MeasureResolver()
+
+
+@event.listens_for(FoodMeasure, "after_insert")
+@event.listens_for(FoodMeasure, "after_delete")
+def _measure_written(mapper, connection, target):
+    if target.food_id is not None:
+        measure_resolver.invalidate(target.food_id)
+
+
+@event.listens_for(FoodMeasure, "after_update")
+def _measure_updated(mapper, connection, target):
+    history = sa_inspect(target).attrs.food_id.history
+    for food_id in list(history.deleted or []) + [target.food_id]:
+        if food_id is not None:
+            measure_resolver.invalidate(food_id)
+
+
+@event.listens_for(Food, "after_update")
+def _food_renamed(mapper, connection, target):
+    # Overrides are keyed by food name.
+    if sa_inspect(target).attrs.name.history.has_changes():
+        measure_resolver.invalidate(target.id)
+
+
+class FoodProfileStore:
+    """Process-wide per-gram nutrient profiles, stored in arrays indexed by food id.
+
+    Row ``food_id`` of ``_values`` holds the food's calories, protein, carbs
+    and fats per gram, as computed by ``per_gram_profiles``. The row is
+    trusted while ``_loaded_at[food_id]`` is non-zero and younger than
+    ``ttl``. Unknown or stale ids are loaded together, in chunked ``IN``
+    queries, the first time they are asked for. Ids with no ``Food`` row are
+    cached as zero rows. Writes to ``Food`` in this process drop the
+    affected rows straight away; the ``ttl`` picks up writes from other
+    processes.
+    """
+
+    def __init__(self, ttl: float = 600.0, chunk_size: int = 900) -> None:
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+        self._values = np.zeros((0, len(MACRO_KEYS)))
+        self._loaded_at = np.zeros(0)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _ensure_capacity(self, max_id: int) -> None:
+        size = len(self._loaded_at)
+        if max_id < size:
+            return
+        capacity = max(max_id + 1, size * 2, 1024)
+        values = np.zeros((capacity, len(MACRO_KEYS)))
+        values[:size] = self._values
+        loaded_at = np.zeros(capacity)
+        loaded_at[:size] = self._loaded_at
+        self._values, self._loaded_at = values, loaded_at
+
+    def _load(self, food_ids: List[int]) -> None:
+        with self._lock:
+            generation = self._generation
+        rows: Dict[int, object] = {}
+        for start in range(0, len(food_ids), self.chunk_size):
+            chunk = food_ids[start:start + self.chunk_size]
+            rows.update(
+                (row.id, row)
+                for row in db.session.query(
+                    Food.id, Food.calories, Food.protein_g, Food.carbs_g, Food.fats_g,
+                    Food.serving_size, Food.grams_per_unit,
+                ).filter(Food.id.in_(chunk))
+            )
+        profiles = per_gram_profiles([rows.get(food_id) for food_id in food_ids])
+        with self._lock:
+            self._ensure_capacity(max(food_ids))
+            self._values[food_ids] = profiles
+            # A food written while we were querying must be read again next time.
+            if generation == self._generation:
+                self._loaded_at[food_ids] = time.monotonic()
+
+    def profiles(self, food_ids: Sequence[int]) -> np.ndarray:
+        """Return an ``(n, 4)`` array of per-gram profiles, one row per id in ``food_ids``."""
+        ids = np.asarray(food_ids, dtype=np.int64).reshape(-1)
+        if not len(ids):
+            return np.zeros((0, len(MACRO_KEYS)))
+        if ids.min() < 0:
+            raise ValueError("food ids must be non-negative")
+        now = time.monotonic()
+        with self._lock:
+            self._ensure_capacity(int(ids.max()))
+            loaded_at = self._loaded_at[ids]
+            stale = np.unique(ids[(loaded_at == 0) | (now - loaded_at > self.ttl)])
+            if not len(stale):
+                return self._values[ids]
+        self._load(stale.tolist())
+        with self._lock:
+            return self._values[ids]
+
+    def invalidate(self, food_id: Optional[int] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if food_id is None:
+                self._loaded_at[:] = 0
+            elif 0 <= food_id < len(self._loaded_at):
+                self._loaded_at[food_id] = 0
+
+
+food_profiles = FoodProfileStore()
+
+
+@event.listens_for(Food, "after_insert")
+@event.listens_for(Food, "after_update")
+@event.listens_for(Food, "after_delete")
+def _food_written(mapper, connection, target):
+    if target.id is not None:
+        food_profiles.invalidate(target.id)
+
+
+_MEAL_CACHE_FOOD_FIELDS = ("name", "calories", "protein_g", "carbs_g", "fats_g", "serving_size", "grams_per_unit")
+
+
+def mark_meals_stale(connection, food_ids: Iterable[int]) -> None:
+    """Clear the cached macros of every meal that uses one of ``food_ids``.
+
+    Cached meals embed food names and totals. Call this after changing those
+    columns outside the ORM, where the ``Food`` update event does not fire.
+    """
+    food_ids = list(food_ids)
+    if not food_ids:
+        return
+    for meal_class, ingredient_class in ((TrainerMeal, TrainerMealIngredient), (MemberMeal, MemberMealIngredient)):
+        connection.execute(
+            meal_class.__table__.update()
+            .where(meal_class.id.in_(
+                select(ingredient_class.meal_id).where(ingredient_class.food_id.in_(food_ids))
+            ))
+            .values(calories=None, ingredients_cache=None, updated_at=meal_class.updated_at)
+        )
+
+
+@event.listens_for(Food, "after_update")
+def _food_changed_for_meals(mapper, connection, target):
+    state = sa_inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _MEAL_CACHE_FOOD_FIELDS):
+        mark_meals_stale(connection, [target.id])
+
+
 def find_measure(food_id: int, unit: str) -> Optional[FoodMeasure]:
     """Try to locate a FoodMeasure for a given unit name, ignoring pluralization and punctuation."""
-    for candidate in _candidate_units(unit):
-        if not candidate:
-            continue
-        measure = FoodMeasure.query.filter_by(food_id=food_id, measure_name=candidate).first()
-        if measure and measure.grams:
-            return measure
-    return None
+    resolved = measure_resolver.resolve(food_id, unit)
+    if not resolved or resolved[1] is None:
+        return None
+    return db.session.get(FoodMeasure, resolved[1])
 
 
-def _override_measure(food: Optional[Food], unit: str) -> Optional[float]:
-    if not food:
-        return None
-    overrides = MEASURE_OVERRIDES.get((food.name or "").lower())
-    if not overrides:
-        return None
-    for candidate in _candidate_units(unit):
-        if not candidate:
-            continue
-        grams = overrides.get(candidate)
-        if grams:
-            return float(grams)
-    return None
+def measures_for_foods(food_ids: Iterable[int]) -> Dict[int, list]:
+    """Return each food's de-duplicated measure list, fetched with one ``IN`` query.
+
+    Grams and ounces are always offered as fallbacks, matching ``/member/get-measures``.
+    """
+    ids = {food_id for food_id in food_ids if food_id}
+    grouped: Dict[int, list] = {food_id: [] for food_id in ids}
+    if ids:
+        rows = (
+            FoodMeasure.query
+            .filter(FoodMeasure.food_id.in_(ids))
+            .order_by(FoodMeasure.food_id.asc(), FoodMeasure.id.asc())
+            .all()
+        )
+        seen: Dict[int, set] = {food_id: set() for food_id in ids}
+        for measure in rows:
+            if not measure.grams:
+                continue
+            name = (measure.measure_name or "").strip().lower()
+            if not name or name in seen[measure.food_id]:
+                continue
+            seen[measure.food_id].add(name)
+            grouped[measure.food_id].append({"measure_name": measure.measure_name, "grams": measure.grams})
+
+        for food_id, payload in grouped.items():
+            if "g" not in seen[food_id]:
+                payload.append({"measure_name": "g", "grams": 1})
+            if "oz" not in seen[food_id]:
+                payload.append({"measure_name": "oz", "grams": UNIT_TO_GRAMS.get("oz", 28.35)})
+    return grouped
 
 
 def convert_to_grams(
@@ -228,23 +575,16 @@ def convert_to_grams(
     grams: Optional[float] = None
     volume_ml: Optional[float] = None
 
-    food = Food.query.get(food_id)
-
     if grams_override is not None:
         grams = float(quantity) * float(grams_override)
     else:
         if not normalized_unit or normalized_unit == "g":
             grams = float(quantity)
         else:
-            measure = find_measure(food_id, normalized_unit)
-            if measure and measure.grams:
-                grams = float(quantity) * float(measure.grams)
-            elif normalized_unit in UNIT_TO_GRAMS:
-                grams = float(quantity) * float(UNIT_TO_GRAMS[normalized_unit])
-            else:
-                override_grams = _override_measure(food, normalized_unit)
-                if override_grams:
-                    grams = float(quantity) * override_grams
+            # Food measure, then generic unit, then per-food override.
+            grams_per_unit = measure_resolver.grams_per_unit(food_id, normalized_unit)
+            if grams_per_unit:
+                grams = float(quantity) * grams_per_unit
 
     # Fallback to direct grams if no conversion rule found
     if grams is None:
@@ -260,28 +600,38 @@ def convert_to_grams(
     return grams, volume_ml
 
 
-def calculate_meal_macros(meal: TrainerMeal) -> Dict[str, float]:
-    totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fats": 0.0}
-    for ingredient in meal.ingredients:
-        scaled = scale_food_nutrients(
-            ingredient.food,
-            float(ingredient.quantity_grams or 0.0)
-        )
-        totals["calories"] += scaled["calories"]
-        totals["protein"] += scaled["protein"]
-        totals["carbs"] += scaled["carbs"]
-        totals["fats"] += scaled["fats"]
+def calculate_meals_macros(meals: Sequence[TrainerMeal]) -> List[Dict[str, float]]:
+    """Macro totals for several meals, scaling every ingredient in one batch."""
+    food_ids = []
+    grams = []
+    owners = []
+    for index, meal in enumerate(meals):
+        for ingredient in meal.ingredients:
+            food_ids.append(ingredient.food_id)
+            grams.append(float(ingredient.quantity_grams or 0.0))
+            owners.append(index)
 
-    return {key: round(value, 1) for key, value in totals.items()}
+    totals = np.zeros((len(meals), len(MACRO_KEYS)))
+    if owners:
+        np.add.at(totals, owners, scale_nutrients_batch(food_ids, grams))
+    return [
+        {key: round(float(value), 1) for key, value in zip(MACRO_KEYS, row)}
+        for row in totals
+    ]
 
 
-def serialize_ingredient(ingredient: TrainerMealIngredient) -> Dict[str, Optional[float]]:
+def calculate_meal_macros(meal: TrainerMeal) -> Dict[str, float]:
+    return calculate_meals_macros([meal])[0]
+
+
+def serialize_ingredient(ingredient: TrainerMealIngredient,
+                         macros: Optional[Dict[str, float]] = None) -> Dict[str, Optional[float]]:
     grams = float(ingredient.quantity_grams or 0.0)
     ounces = grams / WEIGHT_OUNCE_IN_GRAMS if grams else 0.0
     volume_ml = float(ingredient.volume_ml or 0.0)
     fluid_oz = volume_ml / FLUID_OUNCE_IN_ML if volume_ml else 0.0
 
-    return {
+    payload = {
         "id": ingredient.id,
         "food_id": ingredient.food_id,
         "name": ingredient.food.name if ingredient.food else "Unknown Food",
@@ -294,12 +644,113 @@ def serialize_ingredient(ingredient: TrainerMealIngredient) -> Dict[str, Optiona
         "notes": ingredient.notes,
         "position": ingredient.position,
     }
+    if macros is not None:
+        # Unrounded, so logging the meal can reuse them as-is.
+        # ``serialize_meal`` strips them again (see ``_LOG_ONLY_KEYS``).
+        payload["quantity_grams"] = grams
+        payload["macros"] = macros
+    return payload
+
 
+# Keys only ``meal_log_items`` reads from the cache; kept out of page payloads.
+_LOG_ONLY_KEYS = ("quantity_grams", "macros")
 
-def serialize_meal(meal) -> Dict[str, object]:
+
+def refresh_meal_cache(meal) -> None:
+    """Store ``meal``'s macro totals and serialized ingredients.
+
+    Call after saving the meal's ingredients and flushing, so every
+    ingredient has its id.
+    """
+    ingredients = list(meal.ingredients)
+    scaled = scale_nutrients_batch(
+        [ing.food_id for ing in ingredients],
+        [float(ing.quantity_grams or 0.0) for ing in ingredients],
+    )
+    totals = batch_totals(scaled)
+    for key in MACRO_KEYS:
+        setattr(meal, key, round(totals[key], 1))
+    meal.ingredients_cache = json.dumps([
+        serialize_ingredient(ing, dict(zip(MACRO_KEYS, row)))
+        for ing, row in zip(ingredients, scaled.tolist())
+    ])
+
+
+def _has_cache(meal) -> bool:
+    return meal.calories is not None and meal.ingredients_cache is not None
+
+
+def _load_ingredients(meals: Sequence[object]) -> None:
+    """Load the ingredients and foods of ``meals`` with one query per meal class."""
+    by_class: Dict[type, list] = {}
+    for meal in meals:
+        if "ingredients" in sa_inspect(meal).unloaded:
+            by_class.setdefault(type(meal), []).append(meal)
+    for meal_class, group in by_class.items():
+        ingredient_class = meal_class.ingredients.property.mapper.class_
+        rows = (
+            ingredient_class.query
+            .options(joinedload(ingredient_class.food))
+            .filter(ingredient_class.meal_id.in_([meal.id for meal in group]))
+            .order_by(ingredient_class.position.asc(), ingredient_class.id.asc())
+            .all()
+        )
+        grouped: Dict[int, list] = {meal.id: [] for meal in group}
+        for row in rows:
+            grouped[row.meal_id].append(row)
+        for meal in group:
+            set_committed_value(meal, "ingredients", grouped[meal.id])
+
+
+def meal_log_items(meal) -> List[Dict[str, object]]:
+    """``food_id``, ``name``, ``grams`` and unrounded ``macros`` for each ingredient of ``meal``.
+
+    Read from the meal's cache when it is fresh and carries per-ingredient
+    macros. Otherwise the ingredients and their foods are loaded in one
+    query and scaled from the profile store.
+    """
+    if _has_cache(meal):
+        cached = json.loads(meal.ingredients_cache)
+        if all("macros" in item for item in cached):
+            return [
+                {
+                    "food_id": item["food_id"],
+                    "name": item["name"],
+                    "grams": float(item["quantity_grams"] or 0.0),
+                    "macros": item["macros"],
+                }
+                for item in cached
+            ]
+
+    _load_ingredients([meal])
+    ingredients = list(meal.ingredients)
+    grams = [float(ing.quantity_grams or 0.0) for ing in ingredients]
+    scaled = scale_nutrients_batch([ing.food_id for ing in ingredients], grams)
+    return [
+        {
+            "food_id": ing.food_id,
+            "name": ing.food.name if ing.food else "Meal Ingredient",
+            "grams": amount,
+            "macros": dict(zip(MACRO_KEYS, row)),
+        }
+        for ing, amount, row in zip(ingredients, grams, scaled.tolist())
+    ]
+
+
+def serialize_meal(meal, macros: Optional[Dict[str, float]] = None) -> Dict[str, object]:
     owner = 'trainer'
     if isinstance(meal, MemberMeal):
         owner = 'member'
+    if _has_cache(meal):
+        macros = {key: getattr(meal, key) for key in MACRO_KEYS}
+        ingredients = [
+            {key: value for key, value in item.items() if key not in _LOG_ONLY_KEYS}
+            for item in json.loads(meal.ingredients_cache)
+        ]
+    else:
+        if macros is None:
+            macros = calculate_meal_macros(meal)
+        ingredients = [serialize_ingredient(ing) for ing in meal.ingredients]
     return {
         "id": meal.id,
         "name": meal.name,
@@ -309,15 +760,20 @@ def serialize_meal(meal) -> Dict[str, object]:
         "member_id": getattr(meal, "member_id", None),
         "user_id": getattr(meal, "user_id", None),
         "owner": owner,
-        "macros": calculate_meal_macros(meal),
-        "ingredients": [serialize_ingredient(ing) for ing in meal.ingredients],
+        "macros": macros,
+        "ingredients": ingredients,
     }
 
 
 def group_meals_by_slot(meals: Iterable[TrainerMeal]) -> Dict[str, list]:
     grouped = {slot: [] for slot in MEAL_SLOT_LABELS}
+    meals = list(meals)
+    # Meals saved before the cache existed, or whose foods changed since.
+    stale = [meal for meal in meals if not _has_cache(meal)]
+    _load_ingredients(stale)
+    stale_macros = dict(zip(map(id, stale), calculate_meals_macros(stale)))
     for meal in meals:
-        grouped.setdefault(meal.meal_slot, []).append(serialize_meal(meal))
+        grouped.setdefault(meal.meal_slot, []).append(serialize_meal(meal, stale_macros.get(id(meal))))
     for items in grouped.values():
         items.sort(key=lambda m: m["name"].lower())
     return grouped
@@ -0,0 +1,168 @@
+"""Per-member "recent and frequent foods" for one-tap logging.
+
+Members log mostly the same handful of foods, so the dashboard offers them
+before any search is typed. Each process keeps a small summary per member,
+loaded from ``user_food_log`` with one grouped query. The logging routes
+update it in place through ``record_log``, and it is reloaded once
+``QUICK_FOODS_TTL_SECONDS`` have passed so logs written by other workers show
+up.
+
+Logs store grams in ``quantity``; the quantity and unit the member typed are
+kept alongside in ``entered_quantity``/``entered_unit``, so every worker
+offers the same "1 cup" for a food however warm its summary is. Logs without
+them (whole meals) are offered in grams.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+
+from app import db
+from app.models import Food, UserFoodLog
+
+QUICK_FOODS_TTL_SECONDS = 300.0
+QUICK_FOODS_WINDOW_DAYS = 60
+QUICK_FOODS_LIMIT = 10
+# Foods kept per member; the summary only needs enough to fill both lists.
+_FOODS_PER_MEMBER = 50
+_MAX_MEMBERS = 2048
+
+
+class _MemberFoods:
+    __slots__ = ("foods", "loaded_at")
+
+    def __init__(self, foods: Dict[int, dict]) -> None:
+        self.foods = foods
+        self.loaded_at = time.monotonic()
+
+
+_cache: "OrderedDict[int, _MemberFoods]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _load(user_id: int, today) -> Dict[int, dict]:
+    cutoff = today - timedelta(days=QUICK_FOODS_WINDOW_DAYS)
+    usage = (
+        db.session.query(
+            UserFoodLog.food_id,
+            func.count(UserFoodLog.id),
+            func.max(UserFoodLog.id),
+        )
+        .filter(UserFoodLog.user_id == user_id, UserFoodLog.log_date >= cutoff)
+        .group_by(UserFoodLog.food_id)
+        .all()
+    )
+    if not usage:
+        return {}
+
+    # Keep the most frequent and the most recent foods, deduplicated.
+    by_count = sorted(usage, key=lambda row: (-row[1], -row[2]))[:_FOODS_PER_MEMBER]
+    by_recent = sorted(usage, key=lambda row: -row[2])[:_FOODS_PER_MEMBER]
+    kept = {row[0]: row for row in by_count + by_recent}
+
+    latest_ids = [row[2] for row in kept.values()]
+    latest = (
+        db.session.query(
+            UserFoodLog.id,
+            func.coalesce(UserFoodLog.entered_quantity, UserFoodLog.quantity),
+            func.coalesce(UserFoodLog.entered_unit, UserFoodLog.unit),
+            Food.name,
+        )
+        .join(Food, Food.id == UserFoodLog.food_id)
+        .filter(UserFoodLog.id.in_(latest_ids))
+        .all()
+    )
+    latest_by_id = {row[0]: row for row in latest}
+
+    foods: Dict[int, dict] = {}
+    for food_id, count, last_log_id in kept.values():
+        row = latest_by_id.get(last_log_id)
+        if row is None:
+            continue
+        foods[food_id] = {
+            "food_id": food_id,
+            "name": row[3],
+            "count": count,
+            "last_log_id": last_log_id,
+            "quantity": row[1],
+            "unit": row[2] or "g",
+        }
+    return foods
+
+
+def _get(user_id: int, today) -> Dict[int, dict]:
+    with _lock:
+        entry = _cache.get(user_id)
+        if entry is not None and time.monotonic() - entry.loaded_at <= QUICK_FOODS_TTL_SECONDS:
+            _cache.move_to_end(user_id)
+            return entry.foods
+
+    foods = _load(user_id, today)
+    with _lock:
+        _cache[user_id] = _MemberFoods(foods)
+        _cache.move_to_end(user_id)
+        while len(_cache) > _MAX_MEMBERS:
+            _cache.popitem(last=False)
+    return foods
+
+
+def quick_foods(user_id: int, today, limit: int = QUICK_FOODS_LIMIT) -> Dict[str, List[dict]]:
+    """Return the member's ``recent`` and ``frequent`` foods, newest/most used first."""
+    items = list(_get(user_id, today).values())
+    recent = sorted(items, key=lambda item: -item["last_log_id"])[:limit]
+    frequent = sorted(items, key=lambda item: (-item["count"], -item["last_log_id"]))[:limit]
+
+    def public(item):
+        return {key: item[key] for key in ("food_id", "name", "count", "quantity", "unit")}
+
+    return {
+        "recent": [public(item) for item in recent],
+        "frequent": [public(item) for item in frequent],
+    }
+
+
+def record_log(user_id: int, log: UserFoodLog, food: Optional[Food] = None) -> None:
+    """Apply a committed log to the member's cached summary, if there is one."""
+    with _lock:
+        entry = _cache.get(user_id)
+        if entry is None:
+            return
+        known = log.food_id in entry.foods
+    name = ""
+    if not known:
+        food = food or log.food
+        name = food.name if food else ""
+    record_logged(
+        user_id,
+        log.food_id,
+        log.id,
+        name,
+        log.entered_quantity if log.entered_quantity is not None else log.quantity,
+        log.entered_unit or log.unit or "g",
+    )
+
+
+def record_logged(user_id: int, food_id: int, log_id: int, name: str,
+                  quantity: float, unit: str = "g") -> None:
+    """``record_log`` for logs written without ORM objects (bulk inserts)."""
+    with _lock:
+        entry = _cache.get(user_id)
+        if entry is None:
+            return
+        item = entry.foods.get(food_id)
+        if item is None:
+            item = entry.foods[food_id] = {"food_id": food_id, "name": name, "count": 0}
+        item["count"] += 1
+        item["last_log_id"] = log_id
+        item["quantity"] = quantity
+        item["unit"] = unit
+
+
+def invalidate(user_id: int) -> None:
+    with _lock:
+        _cache.pop(user_id, None)
@@ -0,0 +1,143 @@
+"""Latency and result telemetry for the search endpoints.
+
+Each instrumented endpoint keeps its most recent ``RING_SIZE`` searches in a
+ring buffer (``collections.deque``). Every search records its latency, result
+count, query length and whether a fallback path (such as typo correction)
+answered it. Searches that raise are recorded as errors and left out of the
+result statistics, so a failure does not count as a zero-hit search. Summaries are computed from the buffer on request, so memory
+stays bounded however much traffic there is.
+
+The numbers are per process. Under gunicorn, each worker reports its own
+share of the traffic.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional
+
+RING_SIZE = 2000
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+QUERY_LENGTH_BUCKETS = (1, 2, 3, 5, 10, 20)
+
+
+class SearchSample(NamedTuple):
+    at: float
+    latency_ms: float
+    results: int
+    query_length: int
+    fallback: bool
+    error: bool = False
+
+
+class SearchProbe:
+    """Filled in by the instrumented code while the search runs."""
+
+    __slots__ = ("results", "fallback")
+
+    def __init__(self) -> None:
+        self.results = 0
+        self.fallback = False
+
+
+def _histogram(values: List[float], edges) -> List[dict]:
+    counts = [0] * (len(edges) + 1)
+    for value in values:
+        counts[bisect_left(edges, value)] += 1
+    buckets = [{"le": edge, "count": count} for edge, count in zip(edges, counts)]
+    buckets.append({"gt": edges[-1], "count": counts[-1]})
+    return buckets
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return round(sorted_values[index], 3)
+
+
+class SearchTelemetry:
+    def __init__(self, ring_size: int = RING_SIZE) -> None:
+        self._samples: Dict[str, Deque[SearchSample]] = {}
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._ring_size = ring_size
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, sample: SearchSample) -> None:
+        with self._lock:
+            ring = self._samples.get(endpoint)
+            if ring is None:
+                ring = self._samples[endpoint] = deque(maxlen=self._ring_size)
+                self._totals[endpoint] = {"searches": 0, "zero_hits": 0, "errors": 0}
+            ring.append(sample)
+            totals = self._totals[endpoint]
+            totals["searches"] += 1
+            if sample.error:
+                totals["errors"] += 1
+            elif sample.results == 0:
+                totals["zero_hits"] += 1
+
+    @contextmanager
+    def track(self, endpoint: str, query: Optional[str]) -> Iterator[SearchProbe]:
+        probe = SearchProbe()
+        started = time.perf_counter()
+        error = False
+        try:
+            yield probe
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.record(endpoint, SearchSample(
+                time.time(), elapsed_ms, probe.results, len((query or "").strip()), probe.fallback, error,
+            ))
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            snapshot = {name: list(ring) for name, ring in self._samples.items()}
+            totals = {name: dict(values) for name, values in self._totals.items()}
+
+        report = {}
+        for name, samples in snapshot.items():
+            latencies = sorted(sample.latency_ms for sample in samples)
+            count = len(samples)
+            answered = [sample for sample in samples if not sample.error]
+            answered_count = len(answered)
+            zero_hits = sum(1 for sample in answered if sample.results == 0)
+            report[name] = {
+                "window": count,
+                "since": min(sample.at for sample in samples) if samples else None,
+                "totals": totals.get(name, {}),
+                "latency_ms": {
+                    "p50": _percentile(latencies, 0.50),
+                    "p90": _percentile(latencies, 0.90),
+                    "p99": _percentile(latencies, 0.99),
+                    "max": round(latencies[-1], 3) if latencies else None,
+                    "histogram": _histogram(latencies, LATENCY_BUCKETS_MS),
+                },
+                "error_rate": round((count - answered_count) / count, 4) if count else None,
+                "results": {
+                    "mean": round(sum(sample.results for sample in answered) / answered_count, 2) if answered_count else None,
+                    "zero_hit_rate": round(zero_hits / answered_count, 4) if answered_count else None,
+                    "fallback_rate": round(sum(sample.fallback for sample in answered) / answered_count, 4) if answered_count else None,
+                },
+                "query_length": _histogram([sample.query_length for sample in samples], QUERY_LENGTH_BUCKETS),
+            }
+        return report
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+
+telemetry = SearchTelemetry()
+
+
+def track_search(endpoint: str, query: Optional[str]):
+    """``with track_search("member.search_foods", q) as probe: ... probe.results = n``"""
+    return telemetry.track(endpoint, query)
@@ -0,0 +1,782 @@
+"""Streaming import of USDA FoodData Central JSON downloads.
+
+The FDC downloads are one JSON object holding a single array
+(``{"SRLegacyFoods": [...]}``). SR Legacy is hundreds of megabytes and Branded
+Foods several gigabytes, so ``json.load`` on them needs gigabytes of RAM.
+``iter_usda_foods`` instead reads the file in fixed-size chunks and decodes one
+array element at a time with ``JSONDecoder.raw_decode``. Memory is bounded by
+the chunk size plus the largest single record, however big the file is.
+
+``UsdaImporter`` writes the records in batches. The ``source_id -> (food.id,
+source_hash)`` map and the existing ``(food_id, measure_name)`` portions are
+loaded once, up front, so no record needs a lookup query. ``source_hash`` is a
+digest of the normalized record, so a re-import after a dataset refresh skips
+every food whose content is unchanged and only touches the rest: new foods
+are inserted (``RETURNING`` their ids), changed ones updated in one
+executemany, and their portions added or corrected. Portions are never
+deleted, because ``add_custom_weights.py`` adds its own to USDA foods.
+
+The transaction is committed every ``commit_every`` records, together with a
+``usda_import_checkpoint`` row per file (its position in records, and whether
+it finished). A rerun picks each file up at its checkpoint, or skips it if it
+finished, as long as the file's size and modification time are unchanged.
+
+Rows are written with Core statements, so ``Food`` mapper events do not fire.
+Meals that use an updated food are marked stale with ``mark_meals_stale``.
+The ``food_fts`` triggers still keep search current, and running app
+processes pick new foods up through their periodic index catch-up.
+
+With several files (or NDJSON shards), ``import_usda_paths_parallel`` runs the
+parsing and normalizing in a process pool. Only this process writes: parsers
+pass normalized batches through a bounded queue, so SQLite never sees two
+writers and memory stays bounded when parsing outruns writing. ``ImportStats``
+records the time spent in each stage, which shows which one to scale.
+``split_usda_file`` (``scripts/split_usda.py``) cuts a download into
+size-bounded JSON or NDJSON shards for that, using the same streaming reader.
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, select
+
+from app.models import Food, FoodMeasure, UsdaImportCheckpoint
+from app.services.nutrition import mark_meals_stale
+
+DATASET_KEYS = ("FoundationFoods", "SRLegacyFoods", "SurveyFoods", "BrandedFoods")
+KILOJOULE_TO_KILOCALORIE = 1 / 4.184
+CHUNK_SIZE = 1 << 20
+BATCH_SIZE = 1000
+COMMIT_EVERY = 10_000
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+MANIFEST_SUFFIX = "_manifest.json"
+MAX_SHARD_BYTES = 90 * 1024 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_DECODER = json.JSONDecoder()
+
+
+class UnknownFormatError(ValueError):
+    """The file is not a USDA FDC download this importer understands."""
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+class _JsonStream:
+    """A sliding window over a text file that decodes one JSON value at a time."""
+
+    def __init__(self, fp, chunk_size: int = CHUNK_SIZE) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        # Buffer index whose byte offset in the file is known, for tell().
+        self._anchor = 0
+        self._anchor_bytes = 0
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # Drop what has been consumed. Reading at least as much as is already
+        # buffered keeps a record much larger than the chunk size from being
+        # re-parsed once per chunk.
+        self.tell()
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        self._anchor = 0
+        chunk = self._fp.read(max(self._chunk_size, len(self._buffer)))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ("" at end of file)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise UnknownFormatError(f"expected {char!r}, found {found or 'end of file'!r}")
+        self._pos += 1
+
+    def tell(self) -> int:
+        """Byte offset of the read position, for a UTF-8 file opened with ``newline=""``."""
+        text = self._buffer[self._anchor:self._pos]
+        self._anchor_bytes += len(text) if text.isascii() else len(text.encode("utf-8"))
+        self._anchor = self._pos
+        return self._anchor_bytes
+
+    def value(self):
+        return self.raw_value()[0]
+
+    def raw_value(self) -> Tuple[object, str]:
+        """Decode the next value; return it with its source text."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number that runs up to the buffer edge may continue in the
+            # next chunk ("1" of "1.5").
+            if (isinstance(value, (int, float))
+                    and _NUMBER_TAIL.match(self._buffer, end).end() == len(self._buffer)
+                    and self._fill()):
+                continue
+            text = self._buffer[self._pos:end]
+            self._pos = end
+            return value, text
+
+    def array_items(self, raw: bool = False) -> Iterator:
+        """Yield the elements of the array whose ``[`` is the next token.
+
+        With ``raw``, yield ``RawRecord``s carrying each element's source text
+        and byte range.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            if raw:
+                self.peek()
+                offset = self.tell()
+                value, text = self.raw_value()
+                yield RawRecord(value, text, offset, self.tell())
+            else:
+                yield self.value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise UnknownFormatError(f"expected ',' or ']', found {separator or 'end of file'!r}")
+
+
+class RawRecord(NamedTuple):
+    record: dict
+    text: str
+    offset: int
+    end: int
+
+
+def _open_dataset(stream: _JsonStream) -> Optional[str]:
+    """Advance ``stream`` to the dataset array; return its key (``None`` for a bare array)."""
+    if stream.peek() == "[":
+        return None
+    stream.expect("{")
+    if stream.peek() == "}":
+        raise UnknownFormatError("empty object")
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key in DATASET_KEYS and stream.peek() == "[":
+            return key
+        stream.value()  # some other top-level member
+        if stream.peek() != ",":
+            raise UnknownFormatError(f"no {' / '.join(DATASET_KEYS)} array")
+        stream.expect(",")
+
+
+def iter_usda_foods(fp, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Yield the food records of an FDC download one at a time.
+
+    Accepts the FDC layout (an object whose dataset key holds the array) and a
+    bare top-level array, such as the JSON shards ``split_usda_file`` writes.
+    Raises ``UnknownFormatError`` when no dataset array is found.
+    """
+    stream = _JsonStream(fp, chunk_size)
+    _open_dataset(stream)
+    yield from stream.array_items()
+
+
+def open_usda_raw(fp, chunk_size: int = CHUNK_SIZE) -> Tuple[Optional[str], Iterator[RawRecord]]:
+    """Return the dataset key and an iterator of ``RawRecord``s for an FDC download.
+
+    ``fp`` must be opened with ``encoding="utf-8", newline=""`` for the byte
+    offsets to match the file. Raises ``UnknownFormatError`` straight away
+    when no dataset array is found.
+    """
+    stream = _JsonStream(fp, chunk_size)
+    key = _open_dataset(stream)
+    return key, stream.array_items(raw=True)
+
+
+def normalize_food(record: dict) -> Optional[Tuple[dict, Dict[str, float]]]:
+    """Return the ``food`` row and ``{measure_name: grams}`` portions for a record.
+
+    Nutrients are per 100 g. ``source_hash`` digests everything else in the
+    row and the portions, so it changes exactly when the import would write
+    something different. Returns ``None`` for records without a description
+    or FDC id.
+    """
+    description = record.get("description")
+    fdc_id = record.get("fdcId")
+    if not description or fdc_id is None:
+        return None
+
+    amounts = {}
+    energy_kcal = None
+    for nutrient in record.get("foodNutrients") or ():
+        info = nutrient.get("nutrient") or {}
+        name = info.get("name")
+        if not name:
+            continue
+        amount = nutrient.get("amount") or 0
+        unit = (info.get("unitName") or "").lower()
+        if name == "Energy":
+            converted = amount * KILOJOULE_TO_KILOCALORIE if unit == "kj" else amount
+            if energy_kcal is None or unit != "kj":
+                energy_kcal = converted
+        else:
+            amounts[name] = amount
+
+    row = {
+        "name": description,
+        "source_id": str(fdc_id),
+        "calories": energy_kcal or 0,
+        "protein_g": amounts.get("Protein", 0),
+        "carbs_g": amounts.get("Carbohydrate, by difference", 0),
+        "fats_g": amounts.get("Total lipid (fat)", 0),
+        "serving_size": 100,
+        "serving_unit": "g",
+    }
+
+    portions = {}
+    for portion in record.get("foodPortions") or ():
+        measure_name = ((portion.get("measureUnit") or {}).get("name") or "").lower()
+        gram_weight = portion.get("gramWeight") or 0
+        if measure_name and gram_weight > 0:
+            portions[measure_name] = gram_weight
+
+    content = json.dumps([row, sorted(portions.items())], sort_keys=True, separators=(",", ":"))
+    row["source_hash"] = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+    return row, portions
+
+
+# ---------------------------------------------------------------------------
+# Splitting
+# ---------------------------------------------------------------------------
+def _shard_entry(name: str) -> dict:
+    return {"path": name, "records": 0, "bytes": 0, "source_offset": None, "source_end": None,
+            "first_fdc_id": None, "last_fdc_id": None}
+
+
+def split_usda_file(path: str, output_dir: str, max_bytes: int = MAX_SHARD_BYTES, ndjson: bool = False,
+                    chunk_size: int = CHUNK_SIZE) -> dict:
+    """Split an FDC download into shards of at most ``max_bytes`` and write a manifest.
+
+    Records are copied from the input text as they stream past, without
+    re-serializing them, so memory stays flat however large the input is. A
+    single record larger than ``max_bytes`` gets a shard of its own. JSON
+    shards are bare arrays; NDJSON shards hold one record per line.
+
+    The manifest (``<name>_manifest.json`` in ``output_dir``, also returned)
+    lists each shard's record count and size, the fdcId range it covers, and
+    the byte range ``[source_offset, source_end)`` its records span in the
+    input, so a reader can seek straight to them.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    suffix = ".ndjson" if ndjson else ".json"
+    closing = b"" if ndjson else b"]"
+    shards: List[dict] = []
+    records = 0
+
+    with open(path, "r", encoding="utf-8", newline="") as source:
+        dataset, items = open_usda_raw(source, chunk_size)
+        out = None
+        shard = None
+        try:
+            for item in items:
+                text = item.text
+                if ndjson and ("\n" in text or "\r" in text):
+                    # Raw newlines can only be whitespace between tokens.
+                    text = text.replace("\r", "").replace("\n", "")
+                data = text.encode("utf-8")
+                if out is not None and shard["bytes"] + 1 + len(data) + len(closing) > max_bytes:
+                    out.write(closing)
+                    shard["bytes"] += len(closing)
+                    out.close()
+                    out = None
+                if out is None:
+                    shard = _shard_entry(f"{stem}_part{len(shards) + 1}{suffix}")
+                    shards.append(shard)
+                    out = open(os.path.join(output_dir, shard["path"]), "wb")
+                    shard["source_offset"] = item.offset
+                if ndjson:
+                    data += b"\n"
+                else:
+                    data = (b"," if shard["records"] else b"[") + data
+                out.write(data)
+                fdc_id = item.record.get("fdcId") if isinstance(item.record, dict) else None
+                if shard["first_fdc_id"] is None:
+                    shard["first_fdc_id"] = fdc_id
+                shard["last_fdc_id"] = fdc_id
+                shard["records"] += 1
+                shard["bytes"] += len(data)
+                shard["source_end"] = item.end
+                records += 1
+            if out is not None:
+                out.write(closing)
+                shard["bytes"] += len(closing)
+        finally:
+            if out is not None:
+                out.close()
+
+    manifest = {
+        "source": os.path.basename(path),
+        "source_bytes": os.path.getsize(path),
+        "dataset": dataset,
+        "format": "ndjson" if ndjson else "json",
+        "records": records,
+        "max_shard_bytes": max_bytes,
+        "shards": shards,
+    }
+    with open(os.path.join(output_dir, f"{stem}{MANIFEST_SUFFIX}"), "w", encoding="utf-8") as fp:
+        json.dump(manifest, fp, indent=2)
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+class ImportStats:
+    """Counts and per-stage timings of an import.
+
+    ``parse_seconds`` is time spent reading and normalizing records (summed
+    over parser processes in pipeline mode), ``blocked_seconds`` is time
+    parsers waited on a full queue, and ``wait_seconds`` is time the writer
+    waited for parsed batches. A writer that mostly waits means parsing is
+    the bottleneck; parsers that mostly block mean writing is.
+    """
+
+    __slots__ = ("records", "skipped", "resumed", "files_skipped",
+                 "foods_added", "foods_updated", "foods_unchanged",
+                 "portions_added", "portions_updated", "seconds",
+                 "parse_seconds", "blocked_seconds", "write_seconds", "wait_seconds")
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.skipped = 0
+        self.resumed = 0
+        self.files_skipped = 0
+        self.foods_added = 0
+        self.foods_updated = 0
+        self.foods_unchanged = 0
+        self.portions_added = 0
+        self.portions_updated = 0
+        self.seconds = 0.0
+        self.parse_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.write_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    @property
+    def written(self) -> int:
+        return self.foods_added + self.foods_updated + self.foods_unchanged
+
+    @property
+    def rate(self) -> float:
+        """Records per second."""
+        return (self.records or self.written) / self.seconds if self.seconds else 0.0
+
+    def add(self, other: "ImportStats") -> None:
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+class Batch(NamedTuple):
+    """Normalized records from one file, and how many of its records they reach through."""
+    source: str
+    position: int
+    rows: List[Tuple[dict, Dict[str, float]]]
+    done: bool = False
+
+
+def normalized_batches(records: Iterable[dict], batch_size: int, stats: ImportStats,
+                       source: str = "", start: int = 0) -> Iterator[Batch]:
+    """Normalize ``records`` after the first ``start`` into batches, counting them in ``stats``.
+
+    The last batch (possibly empty) has ``done`` set.
+    """
+    position = start
+    batch = []
+    for record in itertools.islice(records, start, None):
+        position += 1
+        stats.records += 1
+        normalized = normalize_food(record)
+        if normalized is None:
+            stats.skipped += 1
+            continue
+        batch.append(normalized)
+        if len(batch) >= batch_size:
+            yield Batch(source, position, batch)
+            batch = []
+    yield Batch(source, position, batch, done=True)
+
+
+def file_fingerprint(path: str) -> str:
+    """Size and modification time; a new dataset release changes at least one."""
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _insert_returning_ids(connection, table, rows: List[dict], keys: Tuple[str, ...]) -> Dict[tuple, int]:
+    """Insert ``rows`` and return ``{(row[key], ...): id}``."""
+    columns = [table.c[key] for key in keys]
+    if connection.dialect.insert_executemany_returning:
+        # Batched into multi-row INSERT ... RETURNING statements by SQLAlchemy.
+        result = connection.execute(table.insert().returning(table.c.id, *columns), rows)
+        return {tuple(found): row_id for row_id, *found in result}
+    return {
+        tuple(row[key] for key in keys): connection.execute(table.insert(), row).inserted_primary_key[0]
+        for row in rows
+    }
+
+
+class UsdaImporter:
+    """Batched writer for normalized USDA records.
+
+    One importer can be fed several files; the lookup maps are loaded on the
+    first batch and kept current as rows are written. With ``resume`` off,
+    checkpoints are still written but not used to skip records.
+    """
+
+    def __init__(self, session, batch_size: int = BATCH_SIZE, commit_every: int = COMMIT_EVERY,
+                 progress: Optional[Callable[[ImportStats], None]] = None, resume: bool = True) -> None:
+        self.session = session
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.progress = progress
+        self.resume = resume
+        self._foods: Optional[Dict[str, Tuple[int, Optional[str]]]] = None
+        self._measures: Dict[Tuple[int, str], Tuple[int, float]] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._checkpoints: Dict[str, Tuple[int, bool]] = {}
+
+    def _preload(self) -> None:
+        connection = self.session.connection()
+        self._foods = {
+            source_id: (food_id, source_hash)
+            for source_id, food_id, source_hash in connection.execute(
+                select(Food.source_id, Food.id, Food.source_hash).where(Food.source_id.isnot(None))
+            )
+        }
+        self._measures = {
+            (food_id, measure_name): (measure_id, grams)
+            for measure_id, food_id, measure_name, grams in connection.execute(
+                select(FoodMeasure.id, FoodMeasure.food_id, FoodMeasure.measure_name, FoodMeasure.grams)
+            )
+        }
+
+    # -- checkpoints ---------------------------------------------------------
+    def resume_position(self, path: str) -> Tuple[int, bool]:
+        """Return ``(records already imported, whether the file was finished)`` for ``path``.
+
+        Checkpoints are keyed by file name and only count while the file's
+        size and modification time match.
+        """
+        source = os.path.basename(path)
+        fingerprint = self._fingerprints[source] = file_fingerprint(path)
+        if not self.resume:
+            return 0, False
+        row = self.session.connection().execute(
+            select(UsdaImportCheckpoint.position, UsdaImportCheckpoint.completed)
+            .where(UsdaImportCheckpoint.source == source,
+                   UsdaImportCheckpoint.fingerprint == fingerprint)
+        ).first()
+        return (row.position, bool(row.completed)) if row else (0, False)
+
+    def _save_checkpoints(self) -> None:
+        if not self._checkpoints:
+            return
+        connection = self.session.connection()
+        table = UsdaImportCheckpoint.__table__
+        now = datetime.utcnow()
+        for source, (position, done) in self._checkpoints.items():
+            values = {"fingerprint": self._fingerprints.get(source, ""), "position": position,
+                      "completed": done, "updated_at": now}
+            updated = connection.execute(table.update().where(table.c.source == source).values(**values))
+            if updated.rowcount == 0:
+                connection.execute(table.insert().values(source=source, **values))
+        self._checkpoints.clear()
+
+    def _commit(self) -> None:
+        # Checkpoints commit with the rows they describe.
+        self._save_checkpoints()
+        self.session.commit()
+
+    # -- writing -------------------------------------------------------------
+    def _write_batch(self, batch: List[Tuple[dict, Dict[str, float]]], stats: ImportStats) -> None:
+        connection = self.session.connection()
+        foods = self._foods
+
+        latest: Dict[str, Tuple[dict, Dict[str, float]]] = {}
+        for row, portions in batch:
+            # A record repeated within the batch: the last copy's row wins and
+            # portions accumulate, as they do when the copies land in
+            # different batches.
+            previous = latest.get(row["source_id"])
+            if previous is not None:
+                stats.foods_unchanged += 1
+                portions = {**previous[1], **portions}
+            latest[row["source_id"]] = (row, portions)
+
+        new_foods: Dict[str, dict] = {}
+        changed_foods: List[dict] = []
+        for source_id, (row, _) in latest.items():
+            known = foods.get(source_id)
+            if known is None:
+                new_foods[source_id] = row
+            elif known[1] == row["source_hash"]:
+                stats.foods_unchanged += 1
+            else:
+                changed_foods.append({**row, "food_id": known[0]})
+
+        if new_foods:
+            inserted = _insert_returning_ids(connection, Food.__table__, list(new_foods.values()), ("source_id",))
+            for (source_id,), food_id in inserted.items():
+                foods[source_id] = (food_id, new_foods[source_id]["source_hash"])
+            stats.foods_added += len(new_foods)
+        if changed_foods:
+            table = Food.__table__
+            connection.execute(table.update().where(table.c.id == bindparam("food_id")), changed_foods)
+            for row in changed_foods:
+                foods[row["source_id"]] = (row["food_id"], row["source_hash"])
+            mark_meals_stale(connection, [row["food_id"] for row in changed_foods])
+            stats.foods_updated += len(changed_foods)
+
+        measures = self._measures
+        new_measures: Dict[Tuple[int, str], dict] = {}
+        changed: Dict[int, float] = {}
+        for row in [*new_foods.values(), *changed_foods]:
+            food_id = foods[row["source_id"]][0]
+            for measure_name, grams in latest[row["source_id"]][1].items():
+                key = (food_id, measure_name)
+                existing = measures.get(key)
+                if existing is None:
+                    new_measures[key] = {"food_id": food_id, "measure_name": measure_name, "grams": grams}
+                elif existing[1] != grams:
+                    changed[existing[0]] = grams
+                    measures[key] = (existing[0], grams)
+
+        if new_measures:
+            inserted = _insert_returning_ids(
+                connection, FoodMeasure.__table__, list(new_measures.values()), ("food_id", "measure_name"),
+            )
+            for key, measure_id in inserted.items():
+                measures[key] = (measure_id, new_measures[key]["grams"])
+            stats.portions_added += len(new_measures)
+        if changed:
+            table = FoodMeasure.__table__
+            connection.execute(
+                table.update().where(table.c.id == bindparam("measure_id")).values(grams=bindparam("new_grams")),
+                [{"measure_id": measure_id, "new_grams": grams} for measure_id, grams in changed.items()],
+            )
+            stats.portions_updated += len(changed)
+
+    def write(self, batches: Iterable[Batch], stats: Optional[ImportStats] = None) -> ImportStats:
+        """Write ``batches``, committing (with checkpoints) every ``commit_every`` foods."""
+        stats = stats or ImportStats()
+        started = time.perf_counter()
+        if self._foods is None:
+            self._preload()
+
+        batches = iter(batches)
+        uncommitted = 0
+        while True:
+            waiting = time.perf_counter()
+            batch = next(batches, None)
+            writing = time.perf_counter()
+            stats.wait_seconds += writing - waiting
+            if batch is None:
+                break
+            if batch.rows:
+                self._write_batch(batch.rows, stats)
+                uncommitted += len(batch.rows)
+            if batch.source:
+                self._checkpoints[batch.source] = (batch.position, batch.done)
+            if uncommitted >= self.commit_every:
+                self._commit()
+                uncommitted = 0
+                stats.write_seconds += time.perf_counter() - writing
+                if self.progress:
+                    stats.seconds = time.perf_counter() - started
+                    self.progress(stats)
+            else:
+                stats.write_seconds += time.perf_counter() - writing
+
+        writing = time.perf_counter()
+        self._commit()
+        stats.write_seconds += time.perf_counter() - writing
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def run(self, records: Iterable[dict], source: str = "", start: int = 0) -> ImportStats:
+        """Normalize and import ``records`` in this process. Returns the counts and timings.
+
+        With a ``source``, progress is checkpointed under that name and the
+        first ``start`` records are skipped.
+        """
+        stats = ImportStats()
+        stats.resumed = start
+        self.write(normalized_batches(records, self.batch_size, stats, source, start), stats)
+        # In-process, the writer only waits while the next batch is parsed.
+        stats.parse_seconds = stats.wait_seconds
+        return stats
+
+
+def iter_usda_path(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Yield the records of an FDC download, or of an NDJSON shard (one record per line)."""
+    with open(path, "r", encoding="utf-8") as fp:
+        if path.endswith(NDJSON_SUFFIXES):
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_usda_foods(fp, chunk_size)
+
+
+def _skipped_file(position: int) -> ImportStats:
+    stats = ImportStats()
+    stats.resumed = position
+    stats.files_skipped = 1
+    return stats
+
+
+def import_usda_path(path: str, importer: UsdaImporter, chunk_size: int = CHUNK_SIZE) -> ImportStats:
+    """Stream the file at ``path`` through ``importer``, resuming from its checkpoint."""
+    position, completed = importer.resume_position(path)
+    if completed:
+        return _skipped_file(position)
+    return importer.run(iter_usda_path(path, chunk_size), os.path.basename(path), position)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+_batch_queue = None
+
+
+def _init_parser(batch_queue) -> None:
+    global _batch_queue
+    _batch_queue = batch_queue
+
+
+def _parse_file(path: str, start: int, batch_size: int, chunk_size: int) -> ImportStats:
+    """Parser process: stream ``path`` into the batch queue, then a ``None`` end marker."""
+    stats = ImportStats()
+    started = time.perf_counter()
+    try:
+        records = iter_usda_path(path, chunk_size)
+        for batch in normalized_batches(records, batch_size, stats, os.path.basename(path), start):
+            blocked = time.perf_counter()
+            _batch_queue.put(batch)
+            stats.blocked_seconds += time.perf_counter() - blocked
+    finally:
+        _batch_queue.put(None)
+        stats.parse_seconds = time.perf_counter() - started - stats.blocked_seconds
+    return stats
+
+
+def import_usda_paths_parallel(paths: List[str], importer: UsdaImporter, workers: int,
+                               chunk_size: int = CHUNK_SIZE,
+                               queue_size: Optional[int] = None) -> Tuple[ImportStats, Dict[str, object]]:
+    """Parse ``paths`` in ``workers`` processes while this process writes.
+
+    Parsers hand normalized batches to the single writer (``importer``)
+    through a bounded queue, so at most ``queue_size`` batches are in flight
+    and only one connection ever writes. Batches from different files
+    interleave; a food that appears in more than one file ends up with the
+    content of whichever copy is written last. Files are resumed from their
+    checkpoints like ``import_usda_path``.
+
+    Returns the combined stats and, per path, its parse stats or the
+    ``UnknownFormatError`` it raised. Any other parser error is re-raised
+    after the batches already parsed have been written.
+    """
+    context = multiprocessing.get_context()
+    batch_queue = context.Queue(maxsize=queue_size or workers * 4)
+    stats = ImportStats()
+    results: Dict[str, object] = {}
+    starts = {}
+    for path in paths:
+        position, completed = importer.resume_position(path)
+        if completed:
+            results[path] = _skipped_file(position)
+            stats.add(results[path])
+        else:
+            starts[path] = position
+            stats.resumed += position
+
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_parser,
+                             initargs=(batch_queue,)) as pool:
+        futures = {
+            pool.submit(_parse_file, path, start, importer.batch_size, chunk_size): path
+            for path, start in starts.items()
+        }
+
+        def batches():
+            remaining = len(futures)
+            while remaining:
+                try:
+                    batch = batch_queue.get(timeout=1)
+                except queue.Empty:
+                    # A parser process that died never sends its end marker.
+                    if all(future.done() for future in futures):
+                        return
+                    continue
+                if batch is None:
+                    remaining -= 1
+                else:
+                    yield batch
+
+        try:
+            importer.write(batches(), stats)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            # Parsers blocked on a full queue would keep the pool from shutting down.
+            while not all(future.done() for future in futures):
+                try:
+                    batch_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            raise
+
+        for future, path in futures.items():
+            try:
+                parsed = future.result()
+            except UnknownFormatError as exc:
+                results[path] = exc
+                continue
+            parsed.resumed = starts[path]
+            results[path] = parsed
+            stats.records += parsed.records
+            stats.skipped += parsed.skipped
+            stats.parse_seconds += parsed.parse_seconds
+            stats.blocked_seconds += parsed.blocked_seconds
+    return stats, results
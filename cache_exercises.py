@@ -20,6 +20,7 @@ import requests
 
 from app import create_app, db
 from app.models import ExerciseCatalog
+from app.services.exercise_search import rebuild_index
 
 EXERCISE_SOURCE_URL = "https://raw.githubusercontent.com/yuhonas/free-exercise-db/main/dist/exercises.json"
 EXERCISE_GITHUB_CONTENT_API = "https://api.github.com/repos/yuhonas/free-exercise-db/contents/exercises"
@@ -160,6 +161,7 @@ def upsert_catalog(data: list[dict], delete_missing: bool = True) -> tuple[int,
                 deleted += 1
 
     db.session.commit()
+    rebuild_index()
     return created, updated, deleted
 
 
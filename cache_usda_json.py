@@ -1,165 +1,150 @@
-import json
+import argparse
 import os
 
 from app import create_app, db
-from app.models import Food, FoodMeasure
-
-KILOJOULE_TO_KILOCALORIE = 1 / 4.184
+from app.services.usda_import import (
+    BATCH_SIZE,
+    COMMIT_EVERY,
+    ImportStats,
+    MANIFEST_SUFFIX,
+    NDJSON_SUFFIXES,
+    UnknownFormatError,
+    UsdaImporter,
+    import_usda_path,
+    import_usda_paths_parallel,
+)
 
 app = create_app()
 
 # Directory where you'll put all your USDA JSON files
 USDA_DATA_DIR = "data/usda_foods"  # Update this path
 
-def import_usda_file(filepath, dataset_name):
+
+def _report_progress(stats):
+    print(f"   … {stats.written:,} foods written ({stats.written / stats.seconds:,.0f}/s)", flush=True)
+
+
+def _report_stages(stats, workers=1):
+    print(f"⏱  {stats.records:,} records in {stats.seconds:.1f}s ({stats.rate:,.0f} records/s)")
+    print(f"   parse {stats.parse_seconds:.1f}s ({workers} process{'es' if workers > 1 else ''})"
+          f" · parsers blocked {stats.blocked_seconds:.1f}s"
+          f" · write {stats.write_seconds:.1f}s · writer idle {stats.wait_seconds:.1f}s")
+
+
+def _report_summary(stats):
+    print(f"\n{'='*60}")
+    print("TOTAL SUMMARY")
+    print(f"{'='*60}")
+    print(f"✅ Total foods imported: {stats.foods_added}")
+    print(f"✅ Foods updated: {stats.foods_updated} (unchanged: {stats.foods_unchanged})")
+    print(f"✅ Total portions imported: {stats.portions_added}")
+    print(f"✅ Portions updated: {stats.portions_updated}")
+
+
+def import_usda_file(filepath, dataset_name, importer=None):
     """Import foods and portions from a single USDA JSON file"""
     print(f"\n{'='*60}")
     print(f"Processing: {dataset_name}")
     print(f"{'='*60}")
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Different datasets have different root keys
-    foods_list = None
-    if 'FoundationFoods' in data:
-        foods_list = data['FoundationFoods']
-    elif 'SRLegacyFoods' in data:
-        foods_list = data['SRLegacyFoods']
-    elif 'SurveyFoods' in data:
-        foods_list = data['SurveyFoods']
-    elif 'BrandedFoods' in data:
-        foods_list = data['BrandedFoods']
-    else:
-        print(f"⚠️  Unknown data format in {filepath}")
-        return 0, 0
-    
-    foods_added = 0
-    portions_added = 0
-    foods_updated = 0
-    
-    for food_data in foods_list:
-        description = food_data.get('description', '')
-        if not description:
-            continue
-        
-        fdc_id = food_data.get('fdcId')
-        
-        # Check if food already exists
-        existing_food = Food.query.filter_by(source_id=str(fdc_id)).first()
-        
-        if not existing_food:
-            # Extract nutrient data (per 100g)
-            nutrient_amounts = {}
-            energy_kcal = None
-
-            for nutrient in food_data.get('foodNutrients', []):
-                nutrient_info = nutrient.get('nutrient', {})
-                name = nutrient_info.get('name')
-                if not name:
-                    continue
-
-                amount = nutrient.get('amount') or 0
-                unit = (nutrient_info.get('unitName') or '').lower()
-
-                if name == 'Energy':
-                    converted = amount * KILOJOULE_TO_KILOCALORIE if unit == 'kj' else amount
-                    if energy_kcal is None or unit != 'kj':
-                        energy_kcal = converted
-                else:
-                    nutrient_amounts[name] = amount
-
-            # Create new food
-            food = Food(
-                name=description,
-                source_id=str(fdc_id),
-                calories=energy_kcal or 0,
-                protein_g=nutrient_amounts.get('Protein', 0),
-                carbs_g=nutrient_amounts.get('Carbohydrate, by difference', 0),
-                fats_g=nutrient_amounts.get('Total lipid (fat)', 0),
-                serving_size=100,
-                serving_unit='g'
-            )
-            db.session.add(food)
-            db.session.flush()  # Get the food.id
-            foods_added += 1
+
+    importer = importer or UsdaImporter(db.session, progress=_report_progress)
+    try:
+        stats = import_usda_path(filepath, importer)
+    except UnknownFormatError as exc:
+        db.session.rollback()
+        print(f"⚠️  Unknown data format in {filepath} ({exc})")
+        return None
+
+    if stats.files_skipped:
+        print(f"⏭  Already imported ({stats.resumed:,} records); use --restart to import it again")
+        return stats
+    if stats.resumed:
+        print(f"↪  Resumed after {stats.resumed:,} records")
+    print(f"✅ Foods added: {stats.foods_added}")
+    print(f"✅ Foods updated: {stats.foods_updated}")
+    print(f"✅ Foods unchanged: {stats.foods_unchanged}")
+    print(f"✅ Portions added: {stats.portions_added}")
+    print(f"✅ Portions updated: {stats.portions_updated}")
+    if stats.skipped:
+        print(f"⚠️  Records skipped (no description or fdcId): {stats.skipped}")
+    _report_stages(stats)
+
+    return stats
+
+
+def import_parallel(data_dir, json_files, importer, workers):
+    """Parse every file in a process pool while this process writes"""
+    paths = [os.path.join(data_dir, json_file) for json_file in json_files]
+    print(f"Parsing with {workers} worker processes")
+    stats, results = import_usda_paths_parallel(paths, importer, workers)
+
+    for path, result in results.items():
+        if isinstance(result, Exception):
+            print(f"⚠️  Unknown data format in {path} ({result})")
+        elif result.files_skipped:
+            print(f"   {os.path.basename(path)}: already imported, skipped")
         else:
-            food = existing_food
-            foods_updated += 1
-        
-        # Import foodPortions
-        food_portions = food_data.get('foodPortions', [])
-        
-        if food_portions:
-            for portion in food_portions:
-                measure_unit = portion.get('measureUnit', {})
-                measure_name = measure_unit.get('name', '').lower()
-                gram_weight = portion.get('gramWeight', 0)
-                
-                if measure_name and gram_weight > 0:
-                    # Check if measure already exists
-                    existing_measure = FoodMeasure.query.filter_by(
-                        food_id=food.id,
-                        measure_name=measure_name
-                    ).first()
-                    
-                    if not existing_measure:
-                        measure = FoodMeasure(
-                            food_id=food.id,
-                            measure_name=measure_name,
-                            grams=gram_weight
-                        )
-                        db.session.add(measure)
-                        portions_added += 1
-                    elif existing_measure.grams != gram_weight:
-                        # Update if different
-                        existing_measure.grams = gram_weight
-    
-    db.session.commit()
-    
-    print(f"✅ Foods added: {foods_added}")
-    print(f"✅ Foods updated: {foods_updated}")
-    print(f"✅ Portions added: {portions_added}")
-    
-    return foods_added, portions_added
+            print(f"   {os.path.basename(path)}: {result.records:,} records, parsed in {result.parse_seconds:.1f}s")
+
+    _report_summary(stats)
+    _report_stages(stats, workers)
+    print("\nDone!")
 
 
 def main():
     """Process all USDA JSON files in the directory"""
-    
-    if not os.path.exists(USDA_DATA_DIR):
-        print(f"❌ Directory not found: {USDA_DATA_DIR}")
+    parser = argparse.ArgumentParser(description="Import USDA FoodData Central JSON files.")
+    parser.add_argument("--data-dir", default=USDA_DATA_DIR, help="directory holding the USDA JSON files")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="records written per bulk insert")
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY, help="records per transaction")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="parser processes; above 1, files are parsed in parallel and written by one writer")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore saved checkpoints and read every file from the start")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir
+    if not os.path.exists(data_dir):
+        print(f"❌ Directory not found: {data_dir}")
         print("\nPlease:")
         print("1. Create the directory")
         print("2. Download USDA datasets from: https://fdc.nal.usda.gov/download-datasets.html")
         print("3. Place JSON files in the directory")
         return
-    
-    json_files = [f for f in os.listdir(USDA_DATA_DIR) if f.endswith('.json')]
-    
+
+    json_files = sorted(
+        f for f in os.listdir(data_dir)
+        if f.endswith(('.json',) + NDJSON_SUFFIXES) and not f.endswith(MANIFEST_SUFFIX)
+    )
+
     if not json_files:
-        print(f"❌ No JSON files found in {USDA_DATA_DIR}")
+        print(f"❌ No JSON or NDJSON files found in {data_dir}")
         return
-    
+
     print(f"Found {len(json_files)} JSON file(s)")
-    
+
     with app.app_context():
-        total_foods = 0
-        total_portions = 0
-        
+        importer = UsdaImporter(
+            db.session,
+            batch_size=args.batch_size,
+            commit_every=args.commit_every,
+            progress=_report_progress,
+            resume=not args.restart,
+        )
+        if args.workers > 1:
+            import_parallel(data_dir, json_files, importer, args.workers)
+            return
+
+        total = ImportStats()
         for json_file in json_files:
-            filepath = os.path.join(USDA_DATA_DIR, json_file)
-            foods, portions = import_usda_file(filepath, json_file)
-            total_foods += foods
-            total_portions += portions
-        
-        print(f"\n{'='*60}")
-        print(f"TOTAL SUMMARY")
-        print(f"{'='*60}")
-        print(f"✅ Total foods imported: {total_foods}")
-        print(f"✅ Total portions imported: {total_portions}")
-        print(f"\nDone!")
+            filepath = os.path.join(data_dir, json_file)
+            stats = import_usda_file(filepath, json_file, importer)
+            if stats is not None:
+                total.add(stats)
+
+        _report_summary(total)
+        print("\nDone!")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -12,6 +12,15 @@ class Config:
     SQLALCHEMY_DATABASE_URI = _database_url or "sqlite:///" + os.path.join(basedir, "db.sqlite3")
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # "auto" uses the database full-text index when its migration has run;
+    # "memory" forces the in-process trigram index.
+    FOOD_SEARCH_BACKEND = os.environ.get("FOOD_SEARCH_BACKEND", "auto")
+    # Comma-separated emails allowed to read /admin/search-telemetry.
+    ADMIN_EMAILS = [
+        email.strip().lower()
+        for email in os.environ.get("ADMIN_EMAILS", "").split(",")
+        if email.strip()
+    ]
     # Mail settings (used for email verification). Configure via environment variables.
     MAIL_SERVER = os.environ.get("MAIL_SERVER") or "smtp.gmail.com"
     MAIL_PORT = int(os.environ.get("MAIL_PORT", 587))
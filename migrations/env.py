@@ -90,9 +90,23 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # The food name search index lives outside the models (FTS5 shadow tables
+    # on SQLite, a generated tsvector column on Postgres); keep autogenerate
+    # from proposing to drop it.
+    def include_object(object_, name, type_, reflected, compare_to):
+        if type_ == "table" and name and name.startswith("food_fts"):
+            return False
+        if type_ == "column" and name == "search_vector" and object_.table.name == "food":
+            return False
+        if type_ == "index" and name == "ix_food_search_vector":
+            return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
@@ -0,0 +1,65 @@
+"""Full-text search index for food names
+
+Revision ID: 3f1c2a9d7e4b
+Revises: 1b5b9c3a1ab3
+Create Date: 2025-12-02 10:15:00.000000
+
+SQLite gets an external-content FTS5 table (``food_fts``) kept in sync with
+``food`` by triggers; Postgres gets a generated ``tsvector`` column with a GIN
+index. Other dialects are left alone and keep using the in-memory index.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7e4b'
+down_revision = '1b5b9c3a1ab3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE food_fts USING fts5("
+            "name, content='food', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        op.execute(
+            "CREATE TRIGGER food_fts_ai AFTER INSERT ON food BEGIN "
+            "INSERT INTO food_fts(rowid, name) VALUES (new.id, new.name); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER food_fts_ad AFTER DELETE ON food BEGIN "
+            "INSERT INTO food_fts(food_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER food_fts_au AFTER UPDATE OF name ON food BEGIN "
+            "INSERT INTO food_fts(food_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+            "INSERT INTO food_fts(rowid, name) VALUES (new.id, new.name); "
+            "END"
+        )
+        op.execute("INSERT INTO food_fts(food_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE food ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(name, ''))) STORED"
+        )
+        op.create_index(
+            'ix_food_search_vector', 'food', ['search_vector'], postgresql_using='gin'
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS food_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS food_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS food_fts_ai")
+        op.execute("DROP TABLE IF EXISTS food_fts")
+    elif dialect == 'postgresql':
+        op.drop_index('ix_food_search_vector', table_name='food')
+        op.execute("ALTER TABLE food DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,35 @@
+"""Add food_popularity counters for search ranking
+
+Revision ID: 5a7e2c91d4f0
+Revises: 3f1c2a9d7e4b
+Create Date: 2025-12-03 09:40:00.000000
+
+Backfilled from existing user_food_log rows; new logs increment it in place.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7e2c91d4f0'
+down_revision = '3f1c2a9d7e4b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'food_popularity',
+        sa.Column('food_id', sa.Integer(), sa.ForeignKey('food.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('log_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute(
+        "INSERT INTO food_popularity (food_id, log_count) "
+        "SELECT food_id, COUNT(*) FROM user_food_log "
+        "WHERE food_id IN (SELECT id FROM food) "
+        "GROUP BY food_id"
+    )
+
+
+def downgrade():
+    op.drop_table('food_popularity')
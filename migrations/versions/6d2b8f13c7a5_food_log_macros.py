@@ -0,0 +1,149 @@
+"""Store scaled macros on user_food_log
+
+Revision ID: 6d2b8f13c7a5
+Revises: 5a7e2c91d4f0
+Create Date: 2025-12-05 14:20:00.000000
+
+Existing rows are backfilled in id-ordered batches using the same scaling
+rule as ``app.services.nutrition.scale_food_nutrients``. Rows the backfill
+cannot reach stay NULL and are scaled on read.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2b8f13c7a5'
+down_revision = '5a7e2c91d4f0'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Frozen copy of app.models.UNIT_TO_GRAMS as of this revision.
+UNIT_TO_GRAMS = {
+    "g": 1, "kg": 1000, "oz": 28.35, "lb": 453.592,
+    "tsp": 4.2, "teaspoon": 4.2, "teaspoons": 4.2,
+    "tbsp": 14.3, "tbs": 14.3, "tablespoon": 14.3, "tablespoons": 14.3,
+    "cup": 240, "cups": 240,
+    "fl oz": 29.5735, "floz": 29.5735, "fluid ounce": 29.5735, "fluid ounces": 29.5735,
+    "ml": 1, "milliliter": 1, "milliliters": 1,
+    "l": 1000, "liter": 1000, "liters": 1000,
+}
+
+user_food_log = sa.table(
+    'user_food_log',
+    sa.column('id', sa.Integer),
+    sa.column('food_id', sa.Integer),
+    sa.column('quantity', sa.Float),
+    sa.column('unit', sa.String),
+    sa.column('calories', sa.Float),
+    sa.column('protein', sa.Float),
+    sa.column('carbs', sa.Float),
+    sa.column('fats', sa.Float),
+)
+food = sa.table(
+    'food',
+    sa.column('id', sa.Integer),
+    sa.column('calories', sa.Float),
+    sa.column('protein_g', sa.Float),
+    sa.column('carbs_g', sa.Float),
+    sa.column('fats_g', sa.Float),
+    sa.column('serving_size', sa.Float),
+    sa.column('grams_per_unit', sa.Float),
+)
+food_measure = sa.table(
+    'food_measure',
+    sa.column('food_id', sa.Integer),
+    sa.column('measure_name', sa.String),
+    sa.column('grams', sa.Float),
+)
+
+
+def _scaled(row, grams):
+    serving = next((v for v in (row.serving_size, row.grams_per_unit) if v and v > 0), 100.0)
+    factor = grams / serving
+    protein = float(row.protein_g or 0.0)
+    carbs = float(row.carbs_g or 0.0)
+    fats = float(row.fats_g or 0.0)
+    macro_calories = protein * 4 + carbs * 4 + fats * 9
+    calories = macro_calories if macro_calories else float(row.food_calories or 0.0)
+    return {
+        'calories': calories * factor,
+        'protein': protein * factor,
+        'carbs': carbs * factor,
+        'fats': fats * factor,
+    }
+
+
+def upgrade():
+    with op.batch_alter_table('user_food_log') as batch_op:
+        batch_op.add_column(sa.Column('calories', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('protein', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('carbs', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('fats', sa.Float(), nullable=True))
+
+    bind = op.get_bind()
+    update = (
+        user_food_log.update()
+        .where(user_food_log.c.id == sa.bindparam('log_id'))
+        .values(
+            calories=sa.bindparam('calories'),
+            protein=sa.bindparam('protein'),
+            carbs=sa.bindparam('carbs'),
+            fats=sa.bindparam('fats'),
+        )
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(
+                user_food_log.c.id,
+                user_food_log.c.food_id,
+                user_food_log.c.quantity,
+                user_food_log.c.unit,
+                food.c.calories.label('food_calories'),
+                food.c.protein_g,
+                food.c.carbs_g,
+                food.c.fats_g,
+                food.c.serving_size,
+                food.c.grams_per_unit,
+            )
+            .select_from(user_food_log.join(food, food.c.id == user_food_log.c.food_id))
+            .where(user_food_log.c.id > last_id)
+            .order_by(user_food_log.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        units = {(row.food_id, (row.unit or 'g').lower()) for row in rows}
+        measured = {
+            (measure.food_id, measure.measure_name): measure.grams
+            for measure in bind.execute(
+                sa.select(food_measure.c.food_id, food_measure.c.measure_name, food_measure.c.grams)
+                .where(food_measure.c.food_id.in_({food_id for food_id, unit in units if unit != 'g'}))
+            )
+        } if any(unit != 'g' for _, unit in units) else {}
+
+        params = []
+        for row in rows:
+            unit = (row.unit or 'g').lower()
+            quantity = float(row.quantity or 0.0)
+            if unit == 'g':
+                grams = quantity
+            elif measured.get((row.food_id, unit)):
+                grams = quantity * measured[(row.food_id, unit)]
+            else:
+                grams = quantity * UNIT_TO_GRAMS.get(unit, 1)
+            params.append({'log_id': row.id, **_scaled(row, grams)})
+        bind.execute(update, params)
+
+
+def downgrade():
+    with op.batch_alter_table('user_food_log') as batch_op:
+        batch_op.drop_column('fats')
+        batch_op.drop_column('carbs')
+        batch_op.drop_column('protein')
+        batch_op.drop_column('calories')
@@ -0,0 +1,43 @@
+"""Add daily_nutrition rollups
+
+Revision ID: 8e4c1d7a2b90
+Revises: 6d2b8f13c7a5
+Create Date: 2025-12-06 10:05:00.000000
+
+One row per (user_id, date), built from user_food_log's stored macros.
+From here on UserFoodLog mapper events keep it current;
+scripts/rebuild_daily_nutrition.py recomputes it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4c1d7a2b90'
+down_revision = '6d2b8f13c7a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'daily_nutrition',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('date', sa.Date(), primary_key=True),
+        sa.Column('calories', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('protein', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('carbs', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('fats', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('log_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute(
+        "INSERT INTO daily_nutrition (user_id, date, calories, protein, carbs, fats, log_count) "
+        "SELECT user_id, log_date, COALESCE(SUM(calories), 0), COALESCE(SUM(protein), 0), "
+        "COALESCE(SUM(carbs), 0), COALESCE(SUM(fats), 0), COUNT(*) "
+        "FROM user_food_log WHERE log_date IS NOT NULL "
+        "GROUP BY user_id, log_date"
+    )
+
+
+def downgrade():
+    op.drop_table('daily_nutrition')
@@ -0,0 +1,41 @@
+"""Cache macro totals and serialized ingredients on meals
+
+Revision ID: 9f3a6b2c4d81
+Revises: 8e4c1d7a2b90
+Create Date: 2025-12-08 11:30:00.000000
+
+Existing meals start with NULL (stale) caches. They are computed on read,
+in one batched query per meal list, and stored the next time the meal's
+ingredients are saved.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f3a6b2c4d81'
+down_revision = '8e4c1d7a2b90'
+branch_labels = None
+depends_on = None
+
+MEAL_TABLES = ('trainer_meal', 'member_meal')
+
+
+def upgrade():
+    for table in MEAL_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('calories', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('protein', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('carbs', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('fats', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('ingredients_cache', sa.Text(), nullable=True))
+
+
+def downgrade():
+    for table in MEAL_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('ingredients_cache')
+            batch_op.drop_column('fats')
+            batch_op.drop_column('carbs')
+            batch_op.drop_column('protein')
+            batch_op.drop_column('calories')
@@ -0,0 +1,41 @@
+"""Content hashes and checkpoints for incremental USDA imports
+
+Revision ID: a4c7e9b15d32
+Revises: 9f3a6b2c4d81
+Create Date: 2025-12-09 16:10:00.000000
+
+Existing foods start without a hash, so the first import after this revision
+rewrites each USDA food once; later imports skip records whose content has
+not changed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e9b15d32'
+down_revision = '9f3a6b2c4d81'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Plain ALTERs: a batch-mode rebuild of ``food`` would drop the food_fts triggers.
+    op.add_column('food', sa.Column('source_hash', sa.String(length=32), nullable=True))
+
+    op.create_table(
+        'usda_import_checkpoint',
+        sa.Column('source', sa.String(length=255), primary_key=True),
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('usda_import_checkpoint')
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ALTER TABLE food DROP COLUMN source_hash')
+    else:
+        op.drop_column('food', 'source_hash')
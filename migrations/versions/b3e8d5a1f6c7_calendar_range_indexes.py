@@ -0,0 +1,27 @@
+"""Index progress and workout sessions by member and time
+
+Revision ID: b3e8d5a1f6c7
+Revises: a4c7e9b15d32
+Create Date: 2025-12-10 10:05:00.000000
+
+The member calendar reads one month of weights and workouts per request; these
+let those reads range-scan a member's rows instead of the whole table.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8d5a1f6c7'
+down_revision = 'a4c7e9b15d32'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_progress_user_date', 'progress', ['user_id', 'date'])
+    op.create_index('ix_workout_session_user_started', 'workout_session', ['user_id', 'started_at'])
+
+
+def downgrade():
+    op.drop_index('ix_workout_session_user_started', table_name='workout_session')
+    op.drop_index('ix_progress_user_date', table_name='progress')
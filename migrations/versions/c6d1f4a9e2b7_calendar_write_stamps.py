@@ -0,0 +1,38 @@
+"""Write stamps for the calendar API
+
+Revision ID: c6d1f4a9e2b7
+Revises: b3e8d5a1f6c7
+Create Date: 2025-12-11 09:40:00.000000
+
+``daily_nutrition.updated_at`` and ``workout_session.updated_at`` record the
+last write to a member-day's food rollup and to a workout, so calendar ETags
+can be computed from a range scan. Existing sessions are stamped with the time
+they completed (or started). The day detail lists a member's food logs for one
+date, which the new ``user_food_log`` index serves.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6d1f4a9e2b7'
+down_revision = 'b3e8d5a1f6c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('daily_nutrition', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('workout_session', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE workout_session SET updated_at = COALESCE(completed_at, started_at)')
+    op.create_index('ix_user_food_log_user_date', 'user_food_log', ['user_id', 'log_date'])
+
+
+def downgrade():
+    op.drop_index('ix_user_food_log_user_date', table_name='user_food_log')
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ALTER TABLE workout_session DROP COLUMN updated_at')
+        op.execute('ALTER TABLE daily_nutrition DROP COLUMN updated_at')
+    else:
+        op.drop_column('workout_session', 'updated_at')
+        op.drop_column('daily_nutrition', 'updated_at')
@@ -0,0 +1,25 @@
+"""Index messages by client and read state
+
+Revision ID: d2a7c3e8f105
+Revises: c6d1f4a9e2b7
+Create Date: 2025-12-11 15:20:00.000000
+
+Every member dashboard view checks whether the member has any messages and
+any unread ones; this serves both checks without scanning the table.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a7c3e8f105'
+down_revision = 'c6d1f4a9e2b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_message_client_read', 'message', ['client_id', 'read_at'])
+
+
+def downgrade():
+    op.drop_index('ix_message_client_read', table_name='message')
@@ -0,0 +1,34 @@
+"""Version stamp for stored calorie targets
+
+Revision ID: e5b8d1c4a7f3
+Revises: d2a7c3e8f105
+Create Date: 2025-12-12 11:00:00.000000
+
+The member dashboard no longer re-derives and saves calorie targets on every
+view. Targets are written only when their inputs change, and each write bumps
+``user.calorie_targets_version``. Existing values were saved by the last
+dashboard view and start at version 0.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b8d1c4a7f3'
+down_revision = 'd2a7c3e8f105'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'user',
+        sa.Column('calorie_targets_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ALTER TABLE "user" DROP COLUMN calorie_targets_version')
+    else:
+        op.drop_column('user', 'calorie_targets_version')
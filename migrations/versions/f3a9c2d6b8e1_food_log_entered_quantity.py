@@ -0,0 +1,33 @@
+"""Keep the quantity and unit a member typed on each food log
+
+Revision ID: f3a9c2d6b8e1
+Revises: e5b8d1c4a7f3
+Create Date: 2025-12-12 14:30:00.000000
+
+``user_food_log.quantity`` is always grams. Quick foods offer a food again in
+the amount it was last logged, so the typed amount is stored with the log
+rather than only in one worker's memory. Existing logs are offered in grams.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c2d6b8e1'
+down_revision = 'e5b8d1c4a7f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user_food_log', sa.Column('entered_quantity', sa.Float(), nullable=True))
+    op.add_column('user_food_log', sa.Column('entered_unit', sa.String(length=20), nullable=True))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ALTER TABLE user_food_log DROP COLUMN entered_unit')
+        op.execute('ALTER TABLE user_food_log DROP COLUMN entered_quantity')
+    else:
+        op.drop_column('user_food_log', 'entered_unit')
+        op.drop_column('user_food_log', 'entered_quantity')
@@ -1,6 +1,8 @@
 from app import create_app
+from app.services.food_search import warm_index
 
 app = create_app()
 
 if __name__ == "__main__":
+    warm_index(app)
     app.run(debug=True)
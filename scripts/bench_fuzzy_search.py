@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Latency check for typo correction in food search.
+
+Builds a TermVocabulary from synthetic food names (or from a file with one
+food name per line), misspells words drawn from it, and times
+``TermVocabulary.suggest``. Exits non-zero when the p95 latency is above the
+ceiling, so it can gate changes to app/services/food_fuzzy.py.
+
+Usage:
+  python3 scripts/bench_fuzzy_search.py
+  python3 scripts/bench_fuzzy_search.py --names food_names.txt --ceiling-ms 20
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# Ensure project root is on sys.path so we can import the app package
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.food_fuzzy import MIN_TERM_LENGTH, TermVocabulary
+
+SYLLABLES = [
+    "ba", "be", "bro", "car", "chi", "ck", "co", "cre", "da", "en", "fa", "gra",
+    "ha", "in", "ke", "la", "li", "lo", "ma", "mi", "na", "ni", "o", "pa", "pe",
+    "qui", "ra", "ri", "ro", "sa", "se", "sta", "ta", "te", "to", "u", "ve", "yo", "za",
+]
+WORD_RE = re.compile(r"\w+")
+
+
+def synthetic_names(count, vocabulary_size, rng):
+    words = set()
+    while len(words) < vocabulary_size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))))
+    words = sorted(words)
+    for _ in range(count):
+        yield ", ".join(rng.choice(words) for _ in range(rng.randint(2, 6)))
+
+
+def misspell(word, rng):
+    position = rng.randrange(len(word))
+    edit = rng.choice(("delete", "insert", "replace", "swap"))
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    if edit == "delete":
+        return word[:position] + word[position + 1:]
+    if edit == "insert":
+        return word[:position] + letter + word[position:]
+    if edit == "swap" and position < len(word) - 1:
+        return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return word[:position] + letter + word[position + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", help="file with one food name per line")
+    parser.add_argument("--foods", type=int, default=400_000, help="synthetic food names to generate")
+    parser.add_argument("--vocabulary", type=int, default=40_000, help="distinct synthetic words")
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--ceiling-ms", type=float, default=25.0, help="maximum allowed p95 latency")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.names:
+        with open(args.names, encoding="utf-8") as handle:
+            names = [line.strip() for line in handle if line.strip()]
+    else:
+        names = list(synthetic_names(args.foods, args.vocabulary, rng))
+
+    vocabulary = TermVocabulary()
+    started = time.perf_counter()
+    for name in names:
+        vocabulary.add_terms(WORD_RE.findall(name.lower()))
+    build_seconds = time.perf_counter() - started
+
+    words = [word for word in vocabulary if len(word) > MIN_TERM_LENGTH]
+    samples = []
+    hits = 0
+    for _ in range(args.queries):
+        word = rng.choice(words)
+        typo = misspell(word, rng)
+        started = time.perf_counter()
+        suggestions = vocabulary.suggest(typo)
+        samples.append((time.perf_counter() - started) * 1000)
+        hits += word in suggestions
+
+    samples.sort()
+    p50 = samples[len(samples) // 2]
+    p95 = samples[int(len(samples) * 0.95)]
+    print(f"Names: {len(names):,}  vocabulary: {len(vocabulary):,}  build: {build_seconds:.2f}s")
+    print(f"suggest(): p50 {p50:.2f} ms  p95 {p95:.2f} ms  max {samples[-1]:.2f} ms")
+    print(f"Intended word among suggestions: {hits / len(samples):.1%}")
+
+    if p95 > args.ceiling_ms:
+        print(f"FAIL: p95 {p95:.2f} ms exceeds the {args.ceiling_ms:.2f} ms ceiling")
+        return 1
+    print(f"OK: p95 within the {args.ceiling_ms:.2f} ms ceiling")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Compare scalar and batch nutrient scaling.
+
+Builds synthetic foods (including ones with missing calories or serving
+sizes), draws (food, grams) rows from them, and times a loop over
+``scale_food_nutrients`` against one ``scale_foods_batch`` call. Exits
+non-zero if the two disagree.
+
+Usage:
+  python3 scripts/bench_nutrient_scaling.py
+  python3 scripts/bench_nutrient_scaling.py --rows 200000 --repeat 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Ensure project root is on sys.path so we can import the app package
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.nutrition import MACRO_KEYS, scale_food_nutrients, scale_foods_batch
+
+
+def synthetic_food(rng):
+    def maybe(value):
+        return None if rng.random() < 0.1 else value
+
+    return SimpleNamespace(
+        calories=maybe(round(rng.uniform(0, 900), 1)),
+        protein_g=maybe(round(rng.uniform(0, 40), 1)),
+        carbs_g=maybe(round(rng.uniform(0, 80), 1)),
+        fats_g=maybe(round(rng.uniform(0, 50), 1)),
+        serving_size=rng.choice([None, 0, 100, 100, 100, rng.uniform(10, 300)]),
+        grams_per_unit=rng.choice([None, None, rng.uniform(5, 250)]),
+    )
+
+
+def best_of(repeat, func):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foods", type=int, default=5_000, help="distinct synthetic foods")
+    parser.add_argument("--rows", type=int, default=50_000, help="(food, grams) rows to scale")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per path; the best is reported")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    catalog = [synthetic_food(rng) for _ in range(args.foods)]
+    foods = [rng.choice(catalog) for _ in range(args.rows)]
+    grams = [round(rng.uniform(1, 500), 1) for _ in range(args.rows)]
+
+    def scalar():
+        return [scale_food_nutrients(food, amount) for food, amount in zip(foods, grams)]
+
+    scalar_seconds, scalar_rows = best_of(args.repeat, scalar)
+    batch_seconds, batch_rows = best_of(args.repeat, lambda: scale_foods_batch(foods, grams))
+
+    expected = np.array([[row[key] for key in MACRO_KEYS] for row in scalar_rows])
+    matches = np.allclose(expected, batch_rows, rtol=1e-9, atol=1e-9)
+
+    print(f"Rows: {args.rows:,}  foods: {args.foods:,}  best of {args.repeat}")
+    print(f"scalar scale_food_nutrients: {scalar_seconds * 1000:9.2f} ms")
+    print(f"batch scale_foods_batch:     {batch_seconds * 1000:9.2f} ms")
+    print(f"Speedup: {scalar_seconds / batch_seconds:.1f}x")
+
+    if not matches:
+        worst = np.abs(expected - batch_rows).max()
+        print(f"FAIL: batch results differ from the scalar path (max abs diff {worst:.3g})")
+        return 1
+    print("OK: batch results match the scalar path")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Rebuild the daily_nutrition rollups from user_food_log.
+
+The rollups are kept current by the ORM. Run this after editing
+user_food_log by hand or with bulk SQL, or if totals look wrong.
+
+Usage:
+  python3 scripts/rebuild_daily_nutrition.py
+  python3 scripts/rebuild_daily_nutrition.py --user-id 42
+"""
+import argparse
+import os
+import sys
+
+# Ensure project root is on sys.path so we can import the app package
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import create_app
+from app.services.daily_nutrition import rebuild_daily_nutrition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user-id", type=int, help="only rebuild this member's rollups")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        rows = rebuild_daily_nutrition(args.user_id)
+    print(f"Daily rollups written: {rows}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
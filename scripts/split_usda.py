@@ -1,48 +1,57 @@
-import json
+#!/usr/bin/env python3
+"""Split a USDA FoodData Central download into size-bounded shards.
+
+Streams the dataset array, so peak memory stays flat even for the
+multi-gigabyte Branded Foods file. Shards are bare JSON arrays, or NDJSON
+with ``--ndjson``. A ``<name>_manifest.json`` next to them records each
+shard's record count, size, fdcId range and byte range in the input.
+``cache_usda_json.py --data-dir <output> --workers N`` imports the shards in
+parallel.
+
+Usage:
+  python3 scripts/split_usda.py
+  python3 scripts/split_usda.py data/usda_foods/BrandedFoods.json --ndjson --max-mb 64
+"""
+import argparse
 import os
+import sys
+import time
 
-INPUT_FILE = "data/usda_foods/SRLegacyFoods.json"
-OUTPUT_DIR = "data/usda_foods/split"
-MAX_CHUNK_SIZE = 90 * 1024 * 1024  # 90 MB
-
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-with open(INPUT_FILE, "r", encoding="utf-8") as f:
-    raw_data = json.load(f)
-
-# Check the type
-if isinstance(raw_data, dict):
-    # If it's a dict, we need the actual list inside it
-    # For USDA SRLegacyFoods.json, usually it's under 'SRLegacyFoods'
-    data = raw_data.get("SRLegacyFoods", [])
-elif isinstance(raw_data, list):
-    data = raw_data
-else:
-    raise ValueError("Unexpected JSON structure in SRLegacyFoods.json")
+# Ensure project root is on sys.path so we can import the app package
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
-print(f"Total items to split: {len(data)}")
+from app.services.usda_import import MAX_SHARD_BYTES, UnknownFormatError, split_usda_file
 
-chunks = []
-current_chunk = []
-current_size = 0
-
-for item in data:
-    item_json = json.dumps(item, ensure_ascii=False)
-    item_size = len(item_json.encode("utf-8"))
-
-    if current_size + item_size > MAX_CHUNK_SIZE:
-        chunks.append(current_chunk)
-        current_chunk = []
-        current_size = 0
-
-    current_chunk.append(item)
-    current_size += item_size
+INPUT_FILE = "data/usda_foods/SRLegacyFoods.json"
+OUTPUT_DIR = "data/usda_foods/split"
 
-if current_chunk:
-    chunks.append(current_chunk)
 
-for idx, chunk in enumerate(chunks, 1):
-    output_path = os.path.join(OUTPUT_DIR, f"SRLegacyFoods_part{idx}.json")
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(chunk, f, ensure_ascii=False, separators=(',', ':'))
-    print(f"Saved {output_path} ({len(chunk)} items)")
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", default=INPUT_FILE, help="USDA JSON download to split")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--max-mb", type=float, default=MAX_SHARD_BYTES / (1024 * 1024),
+                        help="maximum shard size in MiB")
+    parser.add_argument("--ndjson", action="store_true", help="write one record per line instead of JSON arrays")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        manifest = split_usda_file(args.input, args.output_dir, int(args.max_mb * 1024 * 1024), args.ndjson)
+    except UnknownFormatError as exc:
+        print(f"Unexpected JSON structure in {args.input}: {exc}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    for shard in manifest["shards"]:
+        print(f"Saved {os.path.join(args.output_dir, shard['path'])} ({shard['records']} items)")
+    megabytes = manifest["source_bytes"] / (1024 * 1024)
+    print(f"Split {manifest['records']} items into {len(manifest['shards'])} shard(s) "
+          f"in {elapsed:.1f}s ({megabytes / elapsed if elapsed else 0:.0f} MB/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
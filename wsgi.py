@@ -1,3 +1,5 @@
 from app import create_app
+from app.services.food_search import warm_index
 
 app = create_app()
+warm_index(app)